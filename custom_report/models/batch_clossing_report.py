@@ -26,7 +26,7 @@ class BatchClosingReport(models.Model):
         self.env.cr.execute("""
             CREATE OR REPLACE VIEW batch_closing_report AS (
                 SELECT
-                    row_number() OVER() AS id,
+                    lot.id AS id,
 
                     lot.id AS lot_id,
                     pp.id AS product_id,
@@ -24,7 +24,7 @@ class PurchaseMonthlyReport(models.Model):
         self.env.cr.execute("""
             CREATE OR REPLACE VIEW purchase_monthly_report AS (
                 SELECT
-                    row_number() OVER () AS id,
+                    MIN(pt.id) AS id,
                     MIN(pt.id) AS product_tmpl_id,
 
                     /* OPENING STOCK (before current month) */
@@ -1,6 +1,6 @@
 {
     'name': 'Starplastic MRP',
-    'version': '1.0.0',
+    'version': '1.0.1',
     'category': 'Manufacturing',
     'author': 'Kuldeep Singh',
     'website': '',
@@ -16,6 +16,7 @@
         'views/mrp_workorder_views.xml',
         'views/mrp_production_hourly_count_button_views.xml',
         'views/mrp_workcenter_hourly_entry_views.xml',
+        'views/hourly_entry_import_views.xml',
         'views/mrp_job_party_work_views.xml',
         'views/machine_data_view.xml',
         'report/report_action.xml',
@@ -30,6 +31,7 @@
         'views/res_company_views.xml',
         'views/sale_order_line_views.xml',
         'views/production_memo_views.xml',
+        'views/mrp_production_close_views.xml',
         'report/error_set_tolerance_report.xml',
         'report/error_set_tolerance_summary.xml',
         'report/product_eff_summary.xml',
@@ -37,11 +39,14 @@
         'report/unit_weight_tolerance_summary.xml',
         'report/production_delay_report.xml',
         'report/production_delay_summary.xml',
+        'report/deviation_acknowledge_wizard.xml',
         'report/machine_data_report.xml',
         'report/production_delay_report_template.xml',
         "report/production_completion_memo_report_template.xml",
         'report/raw_material_issue_chit_template.xml',
         "views/power_consumption_views.xml",
+        'views/mrp_workcenter_daily_usage_views.xml',
+        'views/mrp_workcenter_deviation_views.xml',
         'report/power_consumption_analysis_report.xml',
         'views/hr_employee_views.xml',
     ],
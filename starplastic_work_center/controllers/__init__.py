@@ -1 +1,3 @@
 from . import power_consuptution
+from . import shift_grid
+from . import shopfloor_sync
@@ -1,21 +1,138 @@
-from odoo import http
+from odoo import fields, http
 from odoo.http import request
-from datetime import datetime
+from odoo.tools import SQL
 
 
 class PowerMatrixController(http.Controller):
 
+    PAGE_SIZE = 62
+
+    def _get_matrix_domain(self, date_from=None, date_to=None, location_id=None):
+        domain = []
+        if date_from:
+            domain.append(('consumption_date', '>=', fields.Date.to_date(date_from)))
+        if date_to:
+            domain.append(('consumption_date', '<=', fields.Date.to_date(date_to)))
+        if location_id:
+            domain.append(('location_id', '=', int(location_id)))
+        return domain
+
+    def _get_matrix_workcenters(self, location_id=None):
+        wc_domain = [('location_id', '=', int(location_id))] if location_id else []
+        return request.env['mrp.workcenter'].search(wc_domain, order="id")
+
+    def _get_matrix_version(self):
+        """Cheap stamp that changes whenever any matrix input changes."""
+        env = request.env
+        env['mrp.power.consumption'].flush_model()
+        env['mrp.workcenter.daily.usage'].flush_model()
+        env['mrp.workcenter'].flush_model(['name', 'location_id'])
+        env.cr.execute("""
+            SELECT
+                (SELECT COUNT(*) || '-' || COALESCE(MAX(write_date)::text, '')
+                 FROM mrp_power_consumption),
+                (SELECT COUNT(*) || '-' || COALESCE(MAX(write_date)::text, '')
+                 FROM mrp_workcenter_daily_usage),
+                (SELECT COUNT(*) || '-' || COALESCE(MAX(write_date)::text, '')
+                 FROM mrp_workcenter)
+        """)
+        return '/'.join(env.cr.fetchone())
+
+    @http.route('/power/matrix/version', type='json', auth='user')
+    def get_power_matrix_version(self):
+        return {"version": self._get_matrix_version()}
+
+    @http.route('/power/matrix/meta', type='json', auth='user')
+    def get_power_matrix_meta(self, date_from=None, date_to=None, location_id=None):
+        """Matrix layout: machine columns, row count per month and grand totals."""
+        Consumption = request.env['mrp.power.consumption']
+
+        domain = self._get_matrix_domain(date_from, date_to, location_id)
+        workcenters = self._get_matrix_workcenters(location_id)
+
+        months = [
+            {"month": month.strftime('%Y-%m'), "count": count}
+            for month, count in Consumption._read_group(
+                domain, ['consumption_date:month'], ['__count'],
+                order='consumption_date:month',
+            )
+            if month
+        ]
+
+        totals = {
+            "machines": [0.0] * len(workcenters),
+            "load1": 0.0,
+            "load2": 0.0,
+            "ideal": 0.0,
+            "actual": 0.0,
+        }
+        consumptions = Consumption._read_group(
+            domain, [], ['additional_load1:sum', 'additional_load2:sum', 'meter_reading:sum'],
+        )
+        if consumptions:
+            load1, load2, meter = consumptions[0]
+            totals.update(load1=load1 or 0.0, load2=load2 or 0.0, actual=meter or 0.0)
+
+        if workcenters:
+            request.env['mrp.workcenter.daily.usage'].flush_model()
+            request.env.cr.execute(SQL("""
+                SELECT
+                    u.workcenter_id,
+                    SUM(u.machine_minutes),
+                    SUM(u.ideal_kwh)
+                FROM mrp_power_consumption pc
+                JOIN mrp_workcenter_daily_usage u
+                    ON u.date = pc.consumption_date
+                WHERE
+                    pc.id IN %s
+                    AND u.workcenter_id IN %s
+                GROUP BY u.workcenter_id
+            """, Consumption._search(domain).subselect(), tuple(workcenters.ids)))
+            position = {wc_id: index for index, wc_id in enumerate(workcenters.ids)}
+            for workcenter_id, minutes, ideal in request.env.cr.fetchall():
+                totals["machines"][position[workcenter_id]] = minutes or 0.0
+                totals["ideal"] += ideal or 0.0
+
+        return {
+            "workcenters": workcenters.mapped('name'),
+            "months": months,
+            "totals": totals,
+            "version": self._get_matrix_version(),
+        }
+
     @http.route('/power/matrix/data', type='json', auth='user')
-    def get_power_matrix_data(self):
+    def get_power_matrix_data(self, date_from=None, date_to=None, location_id=None,
+                              page=1, page_size=None):
 
-        Workcenter = request.env['mrp.workcenter']
-        Workorder = request.env['mrp.workorder']
+        Usage = request.env['mrp.workcenter.daily.usage']
         Consumption = request.env['mrp.power.consumption']
 
-        workcenters = Workcenter.search([], order="id")
-        consumptions = Consumption.search([], order='consumption_date')
-
-        wc_names = workcenters.mapped('name')
+        page = max(int(page or 1), 1)
+        page_size = max(int(page_size or self.PAGE_SIZE), 1)
+
+        domain = self._get_matrix_domain(date_from, date_to, location_id)
+        workcenters = self._get_matrix_workcenters(location_id)
+
+        total = Consumption.search_count(domain)
+        consumptions = Consumption.search(
+            domain,
+            order='consumption_date, id',
+            limit=page_size,
+            offset=(page - 1) * page_size,
+        )
+
+        # Machine minutes and ideal units of this page, read from the
+        # pre-aggregated daily usage ledger.
+        usage_map = {}
+        dates = [d for d in consumptions.mapped('consumption_date') if d]
+        if dates and workcenters:
+            usages = Usage.search_read([
+                ('date', '>=', min(dates)),
+                ('date', '<=', max(dates)),
+                ('workcenter_id', 'in', workcenters.ids),
+            ], ['date', 'workcenter_id', 'machine_minutes', 'ideal_kwh'], load=None)
+            for usage in usages:
+                usage_map[(usage['date'], usage['workcenter_id'])] = usage
 
         rows = []
 
@@ -25,29 +142,17 @@ class PowerMatrixController(http.Controller):
             total_ideal = 0
 
             for wc in workcenters:
+                usage = usage_map.get((rec.consumption_date, wc.id), {})
+                machine_minutes_list.append(usage.get('machine_minutes', 0))
 
-                # Get workorders of same date & workcenter
-                workorders = Workorder.search([
-                    ('workcenter_id', '=', wc.id),
-                    ('date_finished', '!=', False),
-                ])
-
-                minutes = 0
-
-                for wo in workorders:
-                    if wo.date_finished.date() == rec.consumption_date:
-                        minutes += wo.duration or 0
-
-                machine_minutes_list.append(minutes)
-
-                # Ideal calculation (minutes / 60 * max_power)
-                ideal = (minutes / 60.0) * (wc.max_power or 0)
-                total_ideal += ideal
+                # Ideal calculation (minutes / 60 * max_power), stored on the ledger
+                total_ideal += usage.get('ideal_kwh', 0)
 
             actual = rec.meter_reading or 0
             difference = actual - total_ideal
 
             row = {
+                "id": rec.id,
                 "date": rec.consumption_date.strftime('%d/%m/%Y') if rec.consumption_date else "",
                 "machines": machine_minutes_list,
                 "load1": rec.additional_load1 or 0,
@@ -64,5 +169,9 @@ class PowerMatrixController(http.Controller):
 
         return {
             "rows": rows,
-            "workcenters": wc_names,
-        }
\ No newline at end of file
+            "workcenters": workcenters.mapped('name'),
+            "page": page,
+            "page_size": page_size,
+            "total": total,
+        }
+
@@ -0,0 +1,19 @@
+from odoo import http
+from odoo.http import request
+
+
+class ShiftGridController(http.Controller):
+
+    @http.route('/shopfloor/shift/grid', type='json', auth='user')
+    def save_shift_grid(self, shift_id, slots):
+        """Save a whole shift grid (all hourly slots and their reason lines) at once."""
+        entries = request.env['work.center.hourly.entry'].create_shift_grid(
+            int(shift_id), slots or []
+        )
+        return {
+            "shift_id": int(shift_id),
+            "entries": [
+                {"id": entry.id, "time": entry.time}
+                for entry in entries
+            ],
+        }
@@ -0,0 +1,180 @@
+import logging
+from collections import defaultdict
+
+from psycopg2 import IntegrityError
+
+from odoo import _, http, models
+from odoo.exceptions import AccessError, UserError, ValidationError
+from odoo.http import request
+
+from ..models.mrp_workcenter_hourly_entry import BULK_ENTRY_CONTEXT, GRID_REASON_FIELDS
+
+_logger = logging.getLogger(__name__)
+
+SYNC_ERRORS = (UserError, ValidationError, AccessError, IntegrityError, ValueError)
+
+
+class ShopfloorSyncController(http.Controller):
+    """Offline queue upload for the shop-floor tablets.
+
+    Every item carries a client generated ``uuid`` stored as ``sync_uuid``;
+    items whose key is already known are reported as duplicates and never
+    created twice, so a tablet can safely resend its whole queue.
+    """
+
+    def _result(self, kind, item, status, record_id=False, message=None):
+        return {
+            "uuid": item.get('uuid'),
+            "model": kind,
+            "status": status,
+            "id": record_id,
+            "message": message,
+        }
+
+    def _existing_keys(self, model, uuids):
+        uuids = [uuid for uuid in uuids if uuid]
+        if not uuids:
+            return {}
+        records = request.env[model].search_read(
+            [('sync_uuid', 'in', uuids)], ['sync_uuid'], load=None
+        )
+        return {rec['sync_uuid']: rec['id'] for rec in records}
+
+    def _entry_slot(self, item):
+        slot = {key: value for key, value in item.items() if key not in ('uuid', 'shift_id')}
+        slot['sync_uuid'] = item.get('uuid')
+        slot['reason_lines'] = [
+            dict(line, sync_uuid=line.get('uuid'))
+            for line in item.get('reason_lines') or []
+        ]
+        return slot
+
+    def _reason_vals(self, item, entry_id):
+        vals = {key: item[key] for key in GRID_REASON_FIELDS if key in item}
+        vals.update(sync_uuid=item.get('uuid'), hourly_entry_id=entry_id)
+        return vals
+
+    def _sync_shift(self, shift_id, entries, reason_lines, entry_keys):
+        """Apply the entries and reason lines of one shift atomically."""
+        Entry = request.env['work.center.hourly.entry']
+        ReasonLine = request.env['work.center.hourly.entry.reason.line'].with_context(**BULK_ENTRY_CONTEXT)
+        results = []
+
+        line_keys = self._existing_keys(
+            ReasonLine._name,
+            [item.get('uuid') for item in reason_lines]
+            + [line.get('uuid') for item in entries for line in item.get('reason_lines') or []],
+        )
+        new_entries = []
+        for item in entries:
+            if item.get('uuid') in entry_keys:
+                results.append(self._result('entry', item, 'duplicate', entry_keys[item['uuid']]))
+            else:
+                new_entries.append(item)
+        new_lines = []
+        for item in reason_lines:
+            if item.get('uuid') in line_keys:
+                results.append(self._result('reason_line', item, 'duplicate', line_keys[item['uuid']]))
+            else:
+                new_lines.append(item)
+
+        try:
+            with request.env.cr.savepoint():
+                created = Entry.browse()
+                if new_entries:
+                    created = Entry.create_shift_grid(
+                        shift_id, [self._entry_slot(item) for item in new_entries]
+                    )
+                keys = dict(entry_keys, **{entry.sync_uuid: entry.id for entry in created})
+                line_vals = []
+                for item in new_lines:
+                    entry_id = keys.get(item.get('entry_uuid')) or item.get('hourly_entry_id')
+                    if not entry_id:
+                        raise ValidationError(_(
+                            "Reason line %s refers to an unknown hourly entry.", item.get('uuid')
+                        ))
+                    line_vals.append(self._reason_vals(item, int(entry_id)))
+                lines = ReasonLine.create(line_vals)
+        except SYNC_ERRORS as e:
+            message = str(e.args[0] if e.args else e)
+            _logger.info("Shop-floor sync of shift %s rejected: %s", shift_id, message)
+            results.extend(self._result('entry', item, 'error', message=message) for item in new_entries)
+            results.extend(self._result('reason_line', item, 'error', message=message) for item in new_lines)
+            return results
+
+        results.extend(
+            self._result('entry', item, 'created', entry.id)
+            for item, entry in zip(new_entries, created)
+        )
+        results.extend(
+            self._result('reason_line', item, 'created', line.id)
+            for item, line in zip(new_lines, lines)
+        )
+        return results
+
+    def _sync_machine_data(self, readings):
+        MachineData = request.env['machine.data']
+        writable = set(MachineData._fields) - set(models.MAGIC_COLUMNS) - {'display_name'}
+        known = self._existing_keys(MachineData._name, [item.get('uuid') for item in readings])
+        results = []
+        for item in readings:
+            if item.get('uuid') in known:
+                results.append(self._result('machine_data', item, 'duplicate', known[item['uuid']]))
+                continue
+            vals = {key: value for key, value in item.items() if key in writable}
+            vals['sync_uuid'] = item.get('uuid')
+            try:
+                with request.env.cr.savepoint():
+                    reading = MachineData.create(vals)
+            except SYNC_ERRORS as e:
+                message = str(e.args[0] if e.args else e)
+                results.append(self._result('machine_data', item, 'error', message=message))
+                continue
+            results.append(self._result('machine_data', item, 'created', reading.id))
+        return results
+
+    @http.route('/shopfloor/sync', type='json', auth='user')
+    def sync(self, entries=None, reason_lines=None, machine_data=None):
+        """Upload a queued batch of hourly entries, reason lines and machine readings.
+
+        ``entries`` need a ``shift_id`` and may nest their ``reason_lines``;
+        standalone ``reason_lines`` point to their entry through ``entry_uuid``
+        (an entry of this or an earlier sync) or ``hourly_entry_id``. Each
+        shift is applied in its own savepoint: a rejected shift rolls back
+        alone and the other shifts of the batch are kept.
+        """
+        entries = entries or []
+        reason_lines = reason_lines or []
+        entry_keys = self._existing_keys(
+            'work.center.hourly.entry',
+            [item.get('uuid') for item in entries] + [item.get('entry_uuid') for item in reason_lines],
+        )
+
+        entries_by_shift = defaultdict(list)
+        for item in entries:
+            entries_by_shift[int(item.get('shift_id') or 0)].append(item)
+
+        # standalone lines join the shift of their entry
+        lines_by_shift = defaultdict(list)
+        shift_of_uuid = {
+            item.get('uuid'): int(item.get('shift_id') or 0) for item in entries
+        }
+        parent_ids = {
+            int(item['hourly_entry_id']) for item in reason_lines if item.get('hourly_entry_id')
+        } | set(entry_keys.values())
+        shift_of_id = {
+            entry.id: entry.shift_id.id
+            for entry in request.env['work.center.hourly.entry'].browse(parent_ids).exists()
+        }
+        for item in reason_lines:
+            entry_id = entry_keys.get(item.get('entry_uuid')) or item.get('hourly_entry_id')
+            shift_id = shift_of_uuid.get(item.get('entry_uuid')) or shift_of_id.get(int(entry_id or 0), 0)
+            lines_by_shift[shift_id].append(item)
+
+        results = []
+        for shift_id in sorted(set(entries_by_shift) | set(lines_by_shift)):
+            results.extend(self._sync_shift(
+                shift_id, entries_by_shift[shift_id], lines_by_shift[shift_id], entry_keys
+            ))
+        results.extend(self._sync_machine_data(machine_data or []))
+        return {"results": results}
@@ -0,0 +1,40 @@
+import logging
+
+from odoo import api, SUPERUSER_ID
+
+_logger = logging.getLogger(__name__)
+
+KEPT_TABLE = 'starplastic_kept_hourly_entry'
+
+
+def migrate(cr, version):
+    """Build the RM ledger and recompute what depends on the deduplicated slots.
+
+    The RM lines are now one ledger line per raw material, built once here
+    for the MOs already in the database.
+
+    The duplicates were removed in SQL, so the stored totals of the shifts
+    and production orders of the kept entries, the downtime summary and the
+    deviation ledger still reflect them.
+    """
+    if not version:
+        return
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['mrp.production.rm.line']._rebuild_rm_lines()
+    env.flush_all()
+
+    cr.execute("SELECT to_regclass(%s)", (KEPT_TABLE,))
+    if not cr.fetchone()[0]:
+        return
+    cr.execute("SELECT id FROM %s" % KEPT_TABLE)
+    entry_ids = [row[0] for row in cr.fetchall()]
+
+    entries = env['work.center.hourly.entry'].browse(entry_ids).exists()
+    if entries:
+        entries.modified(['produced_weight_kg', 'reject_weight_kg', 'weight_gm', 'shut_down', 'reason_line_ids'])
+        env.flush_all()
+        env['work.center.shift']._sync_downtime_summary(entries._get_summary_slots())
+        env['work.center.deviation']._refresh_shifts(entries.shift_id.ids)
+        env.flush_all()
+    cr.execute("DROP TABLE %s" % KEPT_TABLE)
+    _logger.info("Recomputed %s deduplicated hourly slots.", len(entries))
@@ -0,0 +1,77 @@
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# ids of the kept entries, read back by post-migrate to recompute their totals
+KEPT_TABLE = 'starplastic_kept_hourly_entry'
+
+
+def migrate(cr, version):
+    """Resolve duplicate hourly slots before the unique constraint is added.
+
+    Entries without production order take the one of their shift. Of each
+    (shift, time slot, production order), the most recently edited entry is
+    kept as is. A duplicate is usually the same slot entered twice, so the
+    values are not added up. The others are removed with their reason lines
+    and logged for manual review.
+    """
+    if not version:
+        return
+
+    cr.execute("""
+        UPDATE work_center_hourly_entry whe
+        SET production_id = wcs.production_id
+        FROM work_center_shift wcs
+        WHERE wcs.id = whe.shift_id
+            AND whe.production_id IS NULL
+            AND wcs.production_id IS NOT NULL
+    """)
+
+    # production_id may still be NULL here: GROUP BY keeps those together
+    cr.execute("""
+        SELECT
+            shift_id, time, production_id,
+            array_agg(id ORDER BY COALESCE(write_date, create_date) DESC NULLS LAST, id DESC)
+        FROM work_center_hourly_entry
+        WHERE shift_id IS NOT NULL
+            AND time IS NOT NULL
+        GROUP BY shift_id, time, production_id
+        HAVING COUNT(*) > 1
+    """)
+    duplicates = cr.fetchall()
+    if not duplicates:
+        return
+
+    cr.execute("CREATE TABLE IF NOT EXISTS %s (id integer PRIMARY KEY)" % KEPT_TABLE)
+    to_delete = []
+    for shift_id, time, production_id, entry_ids in duplicates:
+        keep_id, drop_ids = entry_ids[0], entry_ids[1:]
+        cr.execute("""
+            SELECT
+                whe.id, whe.produced_weight_kg, whe.reject_weight_kg, whe.weight_gm,
+                whe.shut_down, whe.create_date, whe.write_date,
+                (SELECT COUNT(*) FROM work_center_hourly_entry_reason_line rl
+                 WHERE rl.hourly_entry_id = whe.id)
+            FROM work_center_hourly_entry whe
+            WHERE whe.id IN %s
+            ORDER BY whe.id
+        """, (tuple(entry_ids),))
+        for entry in cr.fetchall():
+            _logger.warning(
+                "Hourly entry %s (shift %s, slot %s, MO %s, produced kg %s, rejected kg %s, "
+                "weight gm %s, shut down %s, created %s, updated %s, %s reason lines) %s.",
+                entry[0], shift_id, time, production_id, entry[1], entry[2], entry[3],
+                entry[4], entry[5], entry[6], entry[7],
+                "kept" if entry[0] == keep_id else "removed as a duplicate of entry %s" % keep_id,
+            )
+        cr.execute(
+            "INSERT INTO %s (id) VALUES (%%s) ON CONFLICT DO NOTHING" % KEPT_TABLE, (keep_id,)
+        )
+        to_delete.extend(drop_ids)
+
+    # reason lines cascade with their entry
+    cr.execute("DELETE FROM work_center_hourly_entry WHERE id IN %s", (tuple(to_delete),))
+    _logger.warning(
+        "Removed %s duplicate hourly entries in %s shift slots; review them in the log above.",
+        len(to_delete), len(duplicates),
+    )
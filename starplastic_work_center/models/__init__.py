@@ -3,6 +3,7 @@ from . import product_template
 from . import mrp_routing
 from . import mrp_workorder
 from . import mrp_production
+from . import mrp_bom
 from . import mrp_workcenter_downtime_reason
 from . import mrp_workcenter_hourly_entry
 from . import mrp_shift_management
@@ -12,5 +13,10 @@ from . import sale_order_line
 from . import production_memo
 from . import machine_data
 from . import mrp_rm_return
+from . import mrp_production_close
+from . import stock_move
 from . import power_cunsuption
+from . import mrp_workcenter_usage
+from . import mrp_workcenter_deviation
 from . import hr_employee
+from . import hourly_entry_import
@@ -0,0 +1,332 @@
+import base64
+import csv
+import io
+import logging
+import time
+from collections import OrderedDict
+
+import psycopg2
+
+from odoo import fields, models, _
+from odoo.exceptions import UserError
+
+from .mrp_workcenter_hourly_entry import BULK_ENTRY_CONTEXT
+from .mrp_workcenter_shift import ALL_HOUR_SLOTS
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+# Hourly entries inserted per create() call.
+IMPORT_CHUNK_SIZE = 1000
+# Rejected rows listed on the wizard, the rest are only counted.
+IMPORT_MAX_REJECT_LINES = 500
+
+IMPORT_COLUMNS = (
+    'production', 'date', 'shift', 'time', 'operator_one', 'operator_two',
+    'target_qty', 'produced_weight_kg', 'reject_weight_kg', 'rejection_reason',
+    'weight_gm', 'actual_cycle_time', 'shut_down', 'reason', 'sub_reason',
+    'duration_minutes', 'explanation',
+)
+IMPORT_FLOAT_COLUMNS = (
+    'target_qty', 'produced_weight_kg', 'reject_weight_kg', 'weight_gm', 'actual_cycle_time',
+)
+
+
+class WorkCenterHourlyEntryImport(models.TransientModel):
+    _name = 'work.center.hourly.entry.import'
+    _description = 'Hourly Production Log Import'
+
+    file = fields.Binary(string='File', required=True)
+    file_name = fields.Char(string='File Name')
+    state = fields.Selection(
+        [('draft', 'Draft'), ('done', 'Done')],
+        default='draft'
+    )
+    row_count = fields.Integer(string='Rows Read', readonly=True)
+    imported_count = fields.Integer(string='Entries Imported', readonly=True)
+    reason_count = fields.Integer(string='Reason Lines Imported', readonly=True)
+    rejected_count = fields.Integer(string='Rows Rejected', readonly=True)
+    duration = fields.Float(string='Duration (sec)', readonly=True)
+    rows_per_second = fields.Float(string='Rows / sec', readonly=True)
+    rejected_log = fields.Text(string='Rejected Rows', readonly=True)
+
+    # -------------------------------------------------------------------------
+    # Reading
+    # -------------------------------------------------------------------------
+
+    def _iter_rows(self):
+        """Yield (line number, dict) for every data row of the file."""
+        content = base64.b64decode(self.file)
+        if (self.file_name or '').lower().endswith('.xlsx'):
+            if openpyxl is None:
+                raise UserError(_("Reading XLSX files requires the openpyxl library."))
+            workbook = openpyxl.load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+            rows = workbook.active.iter_rows(values_only=True)
+        else:
+            rows = csv.reader(io.TextIOWrapper(io.BytesIO(content), encoding='utf-8-sig'))
+
+        header = None
+        for line_no, row in enumerate(rows, start=1):
+            if header is None:
+                header = [str(cell or '').strip().lower().replace(' ', '_') for cell in row]
+                missing = {'production', 'date', 'shift', 'time'} - set(header)
+                if missing:
+                    raise UserError(_("Missing columns: %s", ", ".join(sorted(missing))))
+                continue
+            if not any(cell not in (None, '') for cell in row):
+                continue
+            yield line_no, {
+                key: value.strip() if isinstance(value, str) else value
+                for key, value in zip(header, row)
+                if key in IMPORT_COLUMNS
+            }
+
+    # -------------------------------------------------------------------------
+    # Lookup maps
+    # -------------------------------------------------------------------------
+
+    def _build_lookups(self):
+        env = self.env
+        slots = {}
+        for key, label in ALL_HOUR_SLOTS:
+            slots[key] = key
+            slots[label.lower()] = key
+
+        templates = {}
+        code_labels = dict(env['wc.shift.template']._fields['code']._description_selection(env))
+        for template in env['wc.shift.template'].search_read([], ['name', 'code'], load=None):
+            for name in (template['name'], template['code'], code_labels.get(template['code'])):
+                if name:
+                    templates[str(name).lower()] = template['id']
+
+        users = {}
+        for user in env['res.users'].with_context(active_test=False).search_read([], ['name', 'login'], load=None):
+            users[user['login'].lower()] = user['id']
+            users.setdefault(user['name'].lower(), user['id'])
+
+        reasons = {}
+        for reason in env['wc.downtime.reason'].search_read([], ['name', 'code'], load=None):
+            for name in (reason['name'], reason['code']):
+                if name:
+                    reasons[name.lower()] = reason['id']
+
+        sub_reasons = {}
+        for sub in env['wc.downtime.subreason'].search_read([], ['name', 'code', 'reason_id'], load=None):
+            for name in (sub['name'], sub['code']):
+                if name:
+                    sub_reasons[(sub['reason_id'], str(name).lower())] = sub['id']
+
+        return {
+            'slots': slots,
+            'templates': templates,
+            'users': users,
+            'reasons': reasons,
+            'sub_reasons': sub_reasons,
+            'productions': {},
+            'shifts': {},
+        }
+
+    def _resolve_shifts(self, lookups, rows):
+        """Load the productions and shifts referenced by a chunk of rows."""
+        names = {row.get('production') for row in rows} - set(lookups['productions'])
+        names.discard(None)
+        if not names:
+            return
+        productions = self.env['mrp.production'].search_read(
+            [('name', 'in', list(names))], ['name'], load=None
+        )
+        for production in productions:
+            lookups['productions'][production['name']] = production['id']
+        shifts = self.env['work.center.shift'].search_read(
+            [('production_id', 'in', [production['id'] for production in productions])],
+            ['production_id', 'date', 'template_id'], load=None,
+        )
+        for shift in shifts:
+            key = (shift['production_id'], shift['date'], shift['template_id'])
+            lookups['shifts'][key] = shift['id']
+
+    # -------------------------------------------------------------------------
+    # Conversion
+    # -------------------------------------------------------------------------
+
+    def _row_to_vals(self, lookups, row):
+        """Return (entry key, entry vals, reason line vals) or raise ValueError."""
+        production_id = lookups['productions'].get(row.get('production'))
+        if not production_id:
+            raise ValueError(_("Unknown production order %s.", row.get('production')))
+        date = row.get('date')
+        date = date.date() if hasattr(date, 'date') else fields.Date.to_date(date)
+        template_id = lookups['templates'].get(str(row.get('shift') or '').lower())
+        if not template_id:
+            raise ValueError(_("Unknown shift %s.", row.get('shift')))
+        shift_id = lookups['shifts'].get((production_id, date, template_id))
+        if not shift_id:
+            raise ValueError(_("No shift %(shift)s on %(date)s for %(production)s.",
+                               shift=row.get('shift'), date=date, production=row.get('production')))
+        slot = lookups['slots'].get(str(row.get('time') or '').lower())
+        if not slot or slot not in self.env['wc.shift.template'].browse(template_id).get_time_keys():
+            raise ValueError(_("Time slot %s is not within shift hours.", row.get('time')))
+
+        vals = {
+            'shift_id': shift_id,
+            'production_id': production_id,
+            'time': slot,
+            'shut_down': str(row.get('shut_down') or '').lower() in ('1', 'true', 'yes', 'y', 'x'),
+            'rejection_reason': row.get('rejection_reason') or False,
+        }
+        for column in IMPORT_FLOAT_COLUMNS:
+            vals[column] = float(row.get(column) or 0.0)
+        for column, field in (('operator_one', 'operator_one_id'), ('operator_two', 'operator_two_id')):
+            if row.get(column):
+                user_id = lookups['users'].get(str(row[column]).lower())
+                if not user_id:
+                    raise ValueError(_("Unknown operator %s.", row[column]))
+                vals[field] = user_id
+
+        line = None
+        if row.get('reason'):
+            reason_id = lookups['reasons'].get(str(row['reason']).lower())
+            if not reason_id:
+                raise ValueError(_("Unknown downtime reason %s.", row['reason']))
+            line = {
+                'reason_id': reason_id,
+                'duration_minutes': float(row.get('duration_minutes') or 0.0),
+                'explanation': row.get('explanation') or False,
+            }
+            if row.get('sub_reason'):
+                sub_reason_id = lookups['sub_reasons'].get((reason_id, str(row['sub_reason']).lower()))
+                if not sub_reason_id:
+                    raise ValueError(_("Unknown sub reason %s.", row['sub_reason']))
+                line['sub_reason_id'] = sub_reason_id
+        return (shift_id, slot, production_id), vals, line
+
+    # -------------------------------------------------------------------------
+    # Import
+    # -------------------------------------------------------------------------
+
+    def _import_chunk(self, lookups, chunk, rejected):
+        """Create the entries of one chunk; return (entries, reason lines) created."""
+        Entry = self.env['work.center.hourly.entry'].with_context(**BULK_ENTRY_CONTEXT)
+        self._resolve_shifts(lookups, [row for line_no, row in chunk])
+
+        # rows sharing a slot add reason lines to the same entry
+        pending = OrderedDict()
+        for line_no, row in chunk:
+            try:
+                key, vals, line = self._row_to_vals(lookups, row)
+            except (ValueError, TypeError, UserError) as e:
+                rejected.append((line_no, str(e.args[0] if e.args else e)))
+                continue
+            if key not in pending:
+                vals['reason_line_ids'] = []
+                pending[key] = ([line_no], vals)
+            else:
+                pending[key][0].append(line_no)
+            if line:
+                pending[key][1]['reason_line_ids'].append((0, 0, line))
+
+        taken = set()
+        shift_ids = list({key[0] for key in pending})
+        if shift_ids:
+            for entry in Entry.search_read(
+                [('shift_id', 'in', shift_ids)], ['shift_id', 'time', 'production_id'], load=None
+            ):
+                taken.add((entry['shift_id'], entry['time'], entry['production_id']))
+
+        vals_list = []
+        for key, (line_nos, vals) in pending.items():
+            if key in taken:
+                rejected.extend((line_no, _("This time slot is already taken for this shift."))
+                                for line_no in line_nos)
+            elif vals['shut_down'] and not vals['reason_line_ids']:
+                rejected.extend((line_no, _("Please add at least one downtime reason."))
+                                for line_no in line_nos)
+            else:
+                vals_list.append((line_nos, vals))
+
+        if not vals_list:
+            return 0, 0
+        try:
+            with self.env.cr.savepoint():
+                # copies, the rows are created again one by one if the chunk fails
+                Entry.create([dict(vals) for line_nos, vals in vals_list])
+                self.env.flush_all()
+        except (UserError, psycopg2.Error):
+            # one bad row rolled the chunk back: retry row by row to reject only it
+            self.env.invalidate_all()
+            created = [item for item in vals_list if self._import_entry(Entry, item, rejected)]
+        else:
+            created = vals_list
+        finally:
+            # keep the cache small over long imports
+            self.env.invalidate_all()
+        return len(created), sum(len(vals['reason_line_ids']) for line_nos, vals in created)
+
+    def _import_entry(self, Entry, item, rejected):
+        """Create one entry in its own savepoint; return whether it was created."""
+        line_nos, vals = item
+        try:
+            with self.env.cr.savepoint():
+                Entry.create(vals)
+                self.env.flush_all()
+        except (UserError, psycopg2.Error) as e:
+            message = str(e.args[0] if e.args else e)
+            rejected.extend((line_no, message) for line_no in line_nos)
+            return False
+        return True
+
+    def action_import(self):
+        self.ensure_one()
+        start = time.monotonic()
+        lookups = self._build_lookups()
+        rejected = []
+        row_count = imported = reasons = 0
+
+        def slot_of(row):
+            return tuple(row.get(column) for column in ('production', 'date', 'shift', 'time'))
+
+        chunk = []
+        for line_no, row in self._iter_rows():
+            row_count += 1
+            # never split the rows of one slot across two chunks
+            if len(chunk) >= IMPORT_CHUNK_SIZE and slot_of(row) != slot_of(chunk[-1][1]):
+                entries, lines = self._import_chunk(lookups, chunk, rejected)
+                imported += entries
+                reasons += lines
+                chunk = []
+            chunk.append((line_no, row))
+        if chunk:
+            entries, lines = self._import_chunk(lookups, chunk, rejected)
+            imported += entries
+            reasons += lines
+
+        duration = time.monotonic() - start
+        rejected.sort()
+        log = "\n".join(_("Row %(row)s: %(error)s", row=line_no, error=error)
+                        for line_no, error in rejected[:IMPORT_MAX_REJECT_LINES])
+        if len(rejected) > IMPORT_MAX_REJECT_LINES:
+            log += "\n" + _("... and %s more.", len(rejected) - IMPORT_MAX_REJECT_LINES)
+        _logger.info("Imported %s hourly entries from %s rows in %.1fs (%s rejected)",
+                     imported, row_count, duration, len(rejected))
+
+        self.write({
+            'state': 'done',
+            'row_count': row_count,
+            'imported_count': imported,
+            'reason_count': reasons,
+            'rejected_count': len(set(line_no for line_no, error in rejected)),
+            'duration': duration,
+            'rows_per_second': row_count / duration if duration else 0.0,
+            'rejected_log': log,
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
@@ -73,6 +73,12 @@ class MachineData(models.Model):
     temp_8 = fields.Float("Temp 8")
 
     notes = fields.Text()
+    sync_uuid = fields.Char(string='Sync Key', copy=False, readonly=True)
+
+    _sql_constraints = [
+        ('sync_uuid_uniq', 'unique(sync_uuid)',
+         'This machine reading has already been synchronised.'),
+    ]
 
 class MrpWorkorder(models.Model):
     _inherit = "mrp.workorder"
@@ -0,0 +1,26 @@
+from odoo import api, models
+
+
+class MrpBomLine(models.Model):
+    _inherit = 'mrp.bom.line'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        self.env['mrp.production.rm.line']._refresh_boms(lines.bom_id)
+        return lines
+
+    def write(self, vals):
+        if not {'bom_id', 'product_id', 'product_qty', 'product_uom_id'}.intersection(vals):
+            return super().write(vals)
+        boms = self.bom_id
+        res = super().write(vals)
+        # the RM lines hold the BoM requirement of their MOs
+        self.env['mrp.production.rm.line']._refresh_boms(boms | self.bom_id)
+        return res
+
+    def unlink(self):
+        boms = self.bom_id
+        res = super().unlink()
+        self.env['mrp.production.rm.line']._refresh_boms(boms)
+        return res
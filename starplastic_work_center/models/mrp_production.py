@@ -1,3 +1,5 @@
+from collections import defaultdict
+
 from odoo import api, fields, models, _
 import re
 import logging
@@ -41,6 +43,12 @@ class MrpProduction(models.Model):
         'production_id',
         string='Production Memos'
     )
+    rm_line_ids = fields.One2many(
+        'mrp.production.rm.line',
+        'production_id',
+        string='Raw Materials',
+        readonly=True
+    )
     rm_return_ids = fields.One2many(
         'mrp.rm.return.line',
         'production_id',
@@ -131,10 +139,72 @@ class MrpProduction(models.Model):
 
     @api.depends('shift_ids.total_produced_qty')
     def _compute_total_shift_produced(self):
-        for rec in self:
-            rec.total_shift_produced_qty = sum(
-                rec.shift_ids.mapped('total_produced_qty')
+        totals = {}
+        if self.ids:
+            groups = self.env['work.center.shift']._read_group(
+                [('production_id', 'in', self.ids)],
+                ['production_id'],
+                ['total_produced_qty:sum'],
             )
+            totals = {production.id: total for production, total in groups}
+        for rec in self:
+            if isinstance(rec.id, int):
+                rec.total_shift_produced_qty = totals.get(rec.id, 0.0)
+            else:
+                rec.total_shift_produced_qty = sum(
+                    rec.shift_ids.mapped('total_produced_qty')
+                )
+
+    def _get_pmemo_moves(self):
+        """Return the done raw and finished moves of the saved MOs of ``self``.
+
+        One read for the whole recordset: ``(raw, finished)``, each mapping
+        a move id to its MO id, the raw moves in their ``sequence, id`` order.
+        """
+        raw, finished = {}, {}
+        production_ids = [rec.id for rec in self if isinstance(rec.id, int)]
+        if not production_ids:
+            return raw, finished
+        moves = self.env['stock.move'].search_read(
+            [
+                ('state', '=', 'done'),
+                '|',
+                ('raw_material_production_id', 'in', production_ids),
+                ('production_id', 'in', production_ids),
+            ],
+            ['raw_material_production_id', 'production_id', 'product_id'],
+            order='sequence, id',
+            load=None,
+        )
+        for move in moves:
+            if move['raw_material_production_id']:
+                raw[move['id']] = (move['raw_material_production_id'], move['product_id'])
+            else:
+                finished[move['id']] = move['production_id']
+        return raw, finished
+
+    def _get_pmemo_quantities(self):
+        """Return ``{mo id: (rm issued, fg qty)}`` from two grouped aggregates."""
+        raw, finished = self._get_pmemo_moves()
+        quantities = {}
+        MoveLine = self.env['stock.move.line']
+        if raw:
+            for move, qty in MoveLine._read_group(
+                [('move_id', 'in', list(raw)), ('location_dest_id.usage', '=', 'production')],
+                ['move_id'],
+                ['qty_done:sum'],
+            ):
+                issued, fg_qty = quantities.get(raw[move.id][0], (0.0, 0.0))
+                quantities[raw[move.id][0]] = (issued + qty, fg_qty)
+        if finished:
+            for move, qty in MoveLine._read_group(
+                [('move_id', 'in', list(finished))],
+                ['move_id'],
+                ['qty_done:sum'],
+            ):
+                issued, fg_qty = quantities.get(finished[move.id], (0.0, 0.0))
+                quantities[finished[move.id]] = (issued, fg_qty + qty)
+        return quantities
 
     @api.depends(
         "state",
@@ -142,6 +212,10 @@ class MrpProduction(models.Model):
         "bom_id.operation_ids.cavity",
     )
     def _compute_pmemo_extra(self):
+        done = self.filtered(lambda r: r.state == "done")
+        rm_types = {}
+        for production_id, product_id in done._get_pmemo_moves()[0].values():
+            rm_types.setdefault(production_id, product_id)
         for rec in self:
             rec.rm_type = False
             rec.cavity = 0
@@ -149,11 +223,14 @@ class MrpProduction(models.Model):
             if rec.state != "done":
                 continue
 
-            raw_moves = rec.move_raw_ids.filtered(
-                lambda m: m.state == "done"
-            )
-            if raw_moves:
-                rec.rm_type = raw_moves[0].product_id
+            if isinstance(rec.id, int):
+                rec.rm_type = rm_types.get(rec.id, False)
+            else:
+                raw_moves = rec.move_raw_ids.filtered(
+                    lambda m: m.state == "done"
+                )
+                if raw_moves:
+                    rec.rm_type = raw_moves[0].product_id
 
             if rec.bom_id and rec.bom_id.operation_ids:
                 rec.cavity = rec.bom_id.operation_ids[0].cavity or 0
@@ -193,6 +270,19 @@ class MrpProduction(models.Model):
         "rm_return_qty",
     )
     def _compute_pmemo(self):
+        done = self.filtered(lambda r: r.state == "done")
+        quantities = done._get_pmemo_quantities()
+        bom_qty = {}
+        if done.bom_id:
+            bom_qty = {
+                bom.id: qty
+                for bom, qty in self.env['mrp.bom.line']._read_group(
+                    [('bom_id', 'in', done.bom_id.ids)],
+                    ['bom_id'],
+                    ['product_qty:sum'],
+                )
+            }
+
         for rec in self:
             # ---- Default values ----
             rec.rm_required_qty = 0.0
@@ -210,17 +300,24 @@ class MrpProduction(models.Model):
             # ---- RM REQUIRED (from BOM) ----
             if rec.bom_id and rec.bom_id.product_qty:
                 factor = rec.product_qty / rec.bom_id.product_qty
-                rec.rm_required_qty = sum(
-                    line.product_qty * factor
-                    for line in rec.bom_id.bom_line_ids
-                )
+                rec.rm_required_qty = bom_qty.get(rec.bom_id.id, 0.0) * factor
 
-            # ---- RM ISSUED & RETURNED ----
-            issued = 0.0
-            for move in rec.move_raw_ids.filtered(lambda m: m.state == "done"):
-                for ml in move.move_line_ids:
-                    if ml.location_dest_id.usage == "production":
-                        issued += ml.qty_done
+            # ---- RM ISSUED & FG QTY ----
+            if isinstance(rec.id, int):
+                issued, fg_qty = quantities.get(rec.id, (0.0, 0.0))
+            else:
+                # unsaved record (onchange): read the moves in memory
+                issued = sum(
+                    ml.qty_done
+                    for move in rec.move_raw_ids.filtered(lambda m: m.state == "done")
+                    for ml in move.move_line_ids
+                    if ml.location_dest_id.usage == "production"
+                )
+                fg_qty = sum(
+                    ml.qty_done
+                    for move in rec.move_finished_ids.filtered(lambda m: m.state == "done")
+                    for ml in move.move_line_ids
+                )
 
             rec.rm_issued_qty = issued
 
@@ -239,11 +336,6 @@ class MrpProduction(models.Model):
             )
 
             # ---- FG QTY & WEIGHT ----
-            fg_qty = sum(
-                ml.qty_done
-                for move in rec.move_finished_ids.filtered(lambda m: m.state == "done")
-                for ml in move.move_line_ids
-            )
             rec.fg_qty = fg_qty
             rec.fg_weight = fg_qty * rec.unit_weight
 
@@ -270,31 +362,36 @@ class MrpProduction(models.Model):
             else:
                 rec.total_pcs = 0
 
+    @api.model
+    def _get_sale_lines_map(self, order_names):
+        """Return {(order name, product id): order lines} for the given orders.
+
+        All orders are read with one search and their lines are grouped in
+        memory, so the cost depends on the number of distinct orders only.
+        """
+        order_names = {name for name in order_names if name}
+        if not order_names:
+            return {}
+        line_ids = {}
+        seen = set()
+        for order in self.env['sale.order'].search([('name', 'in', list(order_names))]):
+            # like a search on the name with limit=1, keep the first order of a name
+            if order.name in seen:
+                continue
+            seen.add(order.name)
+            for line in order.order_line:
+                line_ids.setdefault((order.name, line.product_id.id), []).append(line.id)
+        SaleOrderLine = self.env['sale.order.line']
+        return {key: SaleOrderLine.browse(ids) for key, ids in line_ids.items()}
+
     @api.depends('origin', 'product_id')
     def _compute_customer_order(self):
+        lines_map = self._get_sale_lines_map(self.mapped('origin'))
         for mo in self:
-            qty = 0.0
-            po_number = False
-            wo_qty = 0.0
-
-            if mo.origin:
-                so = self.env['sale.order'].search([
-                    ('name', '=', mo.origin)
-                ], limit=1)
-
-                if so:
-                    sol = so.order_line.filtered(
-                        lambda l: l.product_id == mo.product_id
-                    )
-
-                    if sol:
-                        qty = sol.product_uom_qty
-                        po_number = sol.co_number
-                        wo_qty = sol.wo_qty
-
-            mo.sale_order_qty = qty
-            mo.customer_po_number = po_number
-            mo.wo_qty = wo_qty
+            sol = lines_map.get((mo.origin, mo.product_id.id), self.env['sale.order.line'])[:1]
+            mo.sale_order_qty = sol.product_uom_qty
+            mo.customer_po_number = sol.co_number
+            mo.wo_qty = sol.wo_qty
 
     def action_view_shifts(self):
         self.ensure_one()
@@ -354,6 +451,13 @@ class MrpProduction(models.Model):
     def write(self, vals):
         res = super().write(vals)
 
+        if 'product_id' in vals:
+            self.env['work.center.deviation']._refresh_productions(self.ids)
+
+        # the BoM requirement of the RM lines is scaled to the MO quantity
+        if ('product_qty' in vals or 'bom_id' in vals) and not self.env.context.get('defer_rm_lines'):
+            self.env['mrp.production.rm.line']._refresh_productions(self)
+
         if "row_material_returned" in vals:
             for mo in self:
                 if mo.row_material_returned > 0:
@@ -404,6 +508,7 @@ class MrpProductionRmLine(models.Model):
         string="Production",
         required=True,
         ondelete="cascade",
+        index=True,
     )
     rm_type = fields.Many2one(
         "product.product",
@@ -418,3 +523,105 @@ class MrpProductionRmLine(models.Model):
     loss_qty = fields.Float(string="RM Loss Qty")
     to_be_made_qty = fields.Float(string="RM To Be Made")
     loss_percent = fields.Float(string="RM Loss (%)")
+
+    _sql_constraints = [
+        ('production_rm_uniq', 'unique(production_id, rm_type)',
+         'Only one line is allowed per raw material of a production.'),
+    ]
+
+    @api.model
+    def _refresh_productions(self, productions):
+        """Recompute the raw material lines of the given MOs.
+
+        One line per (MO, raw material): the BoM requirement scaled to the MO
+        quantity, the quantity issued by done raw moves into production and
+        the quantity returned through RM return lines.
+        """
+        productions = productions.filtered(lambda mo: isinstance(mo.id, int))
+        if not productions:
+            return
+        totals = defaultdict(lambda: {'bom_qty': 0.0, 'issued_qty': 0.0, 'return_qty': 0.0})
+
+        factors = {
+            mo.id: mo.product_qty / mo.bom_id.product_qty
+            for mo in productions if mo.bom_id and mo.bom_id.product_qty
+        }
+        if factors:
+            bom_lines = self.env['mrp.bom.line']._read_group(
+                [('bom_id', 'in', productions.bom_id.ids)],
+                ['bom_id', 'product_id'],
+                ['product_qty:sum'],
+            )
+            bom_qty = defaultdict(list)
+            for bom, product, qty in bom_lines:
+                bom_qty[bom.id].append((product.id, qty))
+            for mo in productions:
+                for product_id, qty in bom_qty.get(mo.bom_id.id, []):
+                    if mo.id in factors:
+                        totals[mo.id, product_id]['bom_qty'] += qty * factors[mo.id]
+
+        raw_moves = productions._get_pmemo_moves()[0]
+        if raw_moves:
+            for move, qty in self.env['stock.move.line']._read_group(
+                [('move_id', 'in', list(raw_moves)), ('location_dest_id.usage', '=', 'production')],
+                ['move_id'],
+                ['qty_done:sum'],
+            ):
+                totals[raw_moves[move.id]]['issued_qty'] += qty
+
+        for production, product, qty in self.env['mrp.rm.return.line']._read_group(
+            [('production_id', 'in', productions.ids)],
+            ['production_id', 'product_id'],
+            ['quantity:sum'],
+        ):
+            totals[production.id, product.id]['return_qty'] += qty
+
+        products = self.env['product.product'].browse({product_id for mo_id, product_id in totals})
+        uoms = {product.id: product.uom_id.id for product in products}
+        new_vals = {}
+        for (production_id, product_id), values in totals.items():
+            bom, issued, returned = values['bom_qty'], values['issued_qty'], values['return_qty']
+            loss = max(issued - bom - returned, 0.0)
+            new_vals[production_id, product_id] = {
+                'uom_id': uoms[product_id],
+                'bom_qty': bom,
+                'issued_qty': issued,
+                'return_qty': returned,
+                'loss_qty': loss,
+                'loss_percent': (loss / bom) * 100 if bom else 0.0,
+                'to_be_made_qty': bom - issued + returned,
+            }
+
+        # maintained by the system, users only read the lines; existing lines
+        # are updated in place so that their ids survive a refresh
+        obsolete = self.sudo()
+        for line in self.sudo().search([('production_id', 'in', productions.ids)]):
+            vals = new_vals.pop((line.production_id.id, line.rm_type.id), None)
+            if vals is None:
+                obsolete |= line
+                continue
+            changed = {
+                name: value for name, value in vals.items()
+                if (line[name].id if name == 'uom_id' else line[name]) != value
+            }
+            if changed:
+                line.write(changed)
+        obsolete.unlink()
+        self.sudo().create([
+            dict(vals, production_id=production_id, rm_type=product_id)
+            for (production_id, product_id), vals in new_vals.items()
+        ])
+
+    @api.model
+    def _refresh_boms(self, boms):
+        """Recompute the lines of the MOs of ``boms`` that already have lines."""
+        productions = self.sudo().search([('production_id.bom_id', 'in', boms.ids)]).production_id
+        for index in range(0, len(productions), 500):
+            self._refresh_productions(productions[index:index + 500])
+
+    @api.model
+    def _rebuild_rm_lines(self):
+        """Recompute the lines of every MO with done raw moves (install)."""
+        productions = self.env['mrp.production'].search([('move_raw_ids.state', '=', 'done')])
+        for index in range(0, len(productions), 500):
+            self._refresh_productions(productions[index:index + 500])
@@ -0,0 +1,204 @@
+import logging
+
+from psycopg2 import Error as PsycopgError
+
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError, ValidationError
+
+_logger = logging.getLogger(__name__)
+
+# MOs closed per cron run when the system parameter is not set.
+DEFAULT_CLOSE_CHUNK_SIZE = 50
+# Stored MO figures recomputed once per chunk instead of once per MO.
+DEFERRED_CLOSE_FIELDS = (
+    'rm_required_qty', 'rm_issued_qty', 'rm_loss_qty', 'rm_loss_percent', 'rm_to_be_made',
+    'fg_qty', 'fg_weight', 'yeild_percent',
+    'rm_type', 'cavity',
+    'date', 'workcenter_id', 'production_qty', 'lot_id', 'unit_weight',
+)
+
+
+class MrpProductionCloseJob(models.Model):
+    _name = 'mrp.production.close.job'
+    _description = 'MO Mass Close Job'
+    _order = 'id desc'
+
+    name = fields.Char(
+        string='Reference',
+        required=True,
+        readonly=True,
+        default=lambda self: _('Close %s', fields.Datetime.now())
+    )
+    state = fields.Selection(
+        [
+            ('queued', 'Queued'),
+            ('running', 'Running'),
+            ('done', 'Done'),
+            ('cancel', 'Cancelled'),
+        ],
+        default='queued',
+        required=True,
+        readonly=True
+    )
+    chunk_size = fields.Integer(
+        string='MOs per Chunk',
+        default=lambda self: int(self.env['ir.config_parameter'].sudo().get_param(
+            'starplastic_work_center.mo_close_chunk_size', DEFAULT_CLOSE_CHUNK_SIZE
+        ))
+    )
+    skip_backorder = fields.Boolean(
+        string='Close Without Backorder',
+        help="Close partially produced orders without creating a backorder. "
+             "When unset, such orders are logged as failed and left open."
+    )
+    skip_consumption = fields.Boolean(
+        string='Accept Consumption Differences',
+        help="Close orders whose component consumption differs from the bill of materials. "
+             "When unset, such orders are logged as failed and left open."
+    )
+    production_ids = fields.Many2many(
+        'mrp.production',
+        string='Manufacturing Orders',
+        readonly=True
+    )
+    line_ids = fields.One2many(
+        'mrp.production.close.job.line',
+        'job_id',
+        string='Log',
+        readonly=True
+    )
+    total_count = fields.Integer(string='MOs', compute='_compute_progress')
+    closed_count = fields.Integer(string='Closed', compute='_compute_progress')
+    failed_count = fields.Integer(string='Failed', compute='_compute_progress')
+    progress = fields.Float(string='Progress', compute='_compute_progress')
+
+    @api.constrains('chunk_size')
+    def _check_chunk_size(self):
+        for job in self:
+            if job.chunk_size <= 0:
+                raise ValidationError(_("The chunk size must be positive."))
+
+    @api.depends('production_ids', 'line_ids.state')
+    def _compute_progress(self):
+        counts = {}
+        if self.ids:
+            for job, state, count in self.env['mrp.production.close.job.line']._read_group(
+                [('job_id', 'in', self.ids)], ['job_id', 'state'], ['__count'],
+            ):
+                counts[job.id, state] = count
+        for job in self:
+            job.total_count = len(job.production_ids)
+            job.closed_count = counts.get((job.id, 'done'), 0)
+            job.failed_count = counts.get((job.id, 'failed'), 0)
+            processed = job.closed_count + job.failed_count
+            job.progress = processed / job.total_count * 100 if job.total_count else 0.0
+
+    @api.model
+    def _schedule(self, productions):
+        """Queue a close job for ``productions`` and wake the cron up."""
+        productions = productions.filtered(lambda mo: mo.state not in ('done', 'cancel'))
+        if not productions:
+            raise UserError(_("There is no open manufacturing order to close in the selection."))
+        job = self.create({'production_ids': [(6, 0, productions.ids)]})
+        self.env.ref('starplastic_work_center.ir_cron_mrp_production_close').sudo()._trigger()
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': job.id,
+            'view_mode': 'form',
+        }
+
+    def action_cancel(self):
+        self.filtered(lambda job: job.state in ('queued', 'running')).write({'state': 'cancel'})
+
+    def _pending_productions(self):
+        self.ensure_one()
+        return self.production_ids - self.line_ids.production_id
+
+    def _close_chunk(self):
+        """Close the next chunk of MOs of the job; return the MOs left after it."""
+        self.ensure_one()
+        pending = self._pending_productions()
+        chunk = pending[:self.chunk_size]
+        Line = self.env['mrp.production.close.job.line'].sudo()
+        deferred = [chunk._fields[name] for name in DEFERRED_CLOSE_FIELDS]
+        log_vals = []
+
+        # the P-Memo figures and RM lines of the chunk are computed once, below
+        with self.env.protecting(deferred, chunk):
+            for production in chunk.with_context(
+                skip_consumption=self.skip_consumption,
+                skip_backorder=self.skip_backorder,
+                defer_rm_lines=True,
+            ):
+                vals = {'job_id': self.id, 'production_id': production.id, 'state': 'done'}
+                try:
+                    with self.env.cr.savepoint():
+                        res = production.button_mark_done()
+                        if production.state != 'done':
+                            raise UserError(self._confirmation_message(res))
+                except (UserError, ValidationError, PsycopgError) as e:
+                    vals.update(state='failed', message=str(e.args[0] if e.args else e))
+                except Exception as e:
+                    # one broken MO must not stall the job: log it and go on
+                    _logger.exception("MO close job %s: closing %s failed", self.name, production.name)
+                    vals.update(state='failed', message=repr(e))
+                log_vals.append(vals)
+
+        closed = chunk.filtered(lambda mo: mo.state == 'done')
+        for field in deferred:
+            self.env.add_to_compute(field, closed)
+        self.env['mrp.production.rm.line']._refresh_productions(closed)
+        Line.create(log_vals)
+        return pending - chunk
+
+    @api.model
+    def _confirmation_message(self, action):
+        """Explain why ``button_mark_done`` returned ``action`` instead of closing the MO."""
+        res_model = isinstance(action, dict) and action.get('res_model')
+        if res_model == 'mrp.production.backorder':
+            return _("The order needs a backorder confirmation.")
+        if res_model == 'mrp.consumption.warning':
+            return _("The order needs a consumption confirmation.")
+        return _("The order needs a manual confirmation (%s).",
+                 isinstance(action, dict) and action.get('name') or action)
+
+    @api.model
+    def _cron_close_productions(self):
+        """Close one chunk per run; the cron is re-run at once while MOs remain."""
+        job = self.search([('state', 'in', ('queued', 'running'))], order='id', limit=1)
+        if not job:
+            return
+        job.state = 'running'
+        pending = len(job._pending_productions())
+        # the MOs are closed with the rights and companies of the requesting user
+        remaining = job.with_user(job.create_uid).with_context(
+            allowed_company_ids=job.production_ids.company_id.ids,
+        )._close_chunk()
+        if not remaining:
+            job.state = 'done'
+        _logger.info("MO close job %s: %s MOs left", job.name, len(remaining))
+        # a finished job hands over to the next queued one, if any
+        self.env['ir.cron']._notify_progress(
+            done=pending - len(remaining),
+            remaining=len(remaining) or self.search_count([('state', '=', 'queued')]),
+        )
+
+
+class MrpProductionCloseJobLine(models.Model):
+    _name = 'mrp.production.close.job.line'
+    _description = 'MO Mass Close Log'
+    _order = 'id'
+
+    job_id = fields.Many2one(
+        'mrp.production.close.job',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
+    production_id = fields.Many2one('mrp.production', string='Manufacturing Order', required=True)
+    state = fields.Selection(
+        [('done', 'Closed'), ('failed', 'Failed')],
+        required=True
+    )
+    message = fields.Text(string='Message')
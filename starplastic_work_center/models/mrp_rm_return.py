@@ -86,36 +86,40 @@ class MrpRmReturnLine(models.Model):
     # --------------------------------------------------
 
     def action_return_material(self):
-
-        for rec in self:
-
-            if rec.stock_move_id:
-                continue
-
+        """Create, confirm and validate the return moves of all lines at once."""
+        todo = self.filtered(lambda rec: not rec.stock_move_id)
+        for rec in todo:
             if rec.quantity <= 0:
                 raise UserError("Return quantity must be greater than zero.")
+            if rec.product_id.tracking != 'none' and not rec.lot_id:
+                raise UserError("Please select Lot/Serial Number for this product.")
+        if not todo:
+            return
 
-            move = self.env['stock.move'].create({
-                'name': 'RM Return',
-                'product_id': rec.product_id.id,
-                'product_uom_qty': rec.quantity,
-                'product_uom': rec.uom_id.id,
+        moves = self.env['stock.move'].create([{
+            'name': 'RM Return',
+            'product_id': rec.product_id.id,
+            'product_uom_qty': rec.quantity,
+            'product_uom': rec.uom_id.id,
 
-                # RETURN FROM PRODUCTION
-                'location_id': rec.source_location_id.id,
+            # RETURN FROM PRODUCTION
+            'location_id': rec.source_location_id.id,
 
-                # RETURN TO STOCK
-                'location_dest_id': rec.location_id.id,
+            # RETURN TO STOCK
+            'location_dest_id': rec.location_id.id,
 
-                'raw_material_production_id': rec.production_id.id,
-                'origin': rec.production_id.name,
+            'raw_material_production_id': rec.production_id.id,
+            'origin': rec.production_id.name,
 
-                # important flag for reports
-                'reference': 'rm_return',
-            })
+            # important flag for reports
+            'reference': 'rm_return',
+        } for rec in todo])
 
-            move._action_confirm()
+        # one move per line: merging would drop moves still zipped with the lines below
+        moves._action_confirm(merge=False)
 
+        move_line_vals_list = []
+        for rec, move in zip(todo, moves):
             move_line_vals = {
                 'move_id': move.id,
                 'product_id': rec.product_id.id,
@@ -127,36 +131,43 @@ class MrpRmReturnLine(models.Model):
 
             # pass lot if product tracking enabled
             if rec.product_id.tracking != 'none':
-                if not rec.lot_id:
-                    raise UserError("Please select Lot/Serial Number for this product.")
                 move_line_vals['lot_id'] = rec.lot_id.id
+            move_line_vals_list.append(move_line_vals)
 
-            self.env['stock.move.line'].create(move_line_vals)
+        self.env['stock.move.line'].create(move_line_vals_list)
 
-            move._action_done()
+        moves._action_done()
 
+        for rec, move in zip(todo, moves):
             rec.stock_move_id = move.id
-            rec.state = 'done'
+        # one write, so the MOs' P-Memo figures are recomputed once (see write)
+        todo.write({'state': 'done'})
 
     # --------------------------------------------------
     # Create
     # --------------------------------------------------
 
-    @api.model
-    def create(self, vals):
+    @api.model_create_multi
+    def create(self, vals_list):
 
-        record = super().create(vals)
+        # default the source location to the MO's finished products location
+        production_ids = {
+            vals['production_id'] for vals in vals_list
+            if vals.get('production_id') and not vals.get('source_location_id')
+        }
+        if production_ids:
+            productions = self.env['mrp.production'].browse(production_ids)
+            locations = {production.id: production.location_dest_id.id for production in productions}
+            for vals in vals_list:
+                if vals.get('production_id') and not vals.get('source_location_id'):
+                    vals['source_location_id'] = locations[vals['production_id']]
 
-        if record.production_id and not record.source_location_id:
-            record.source_location_id = record.production_id.location_dest_id.id
+        records = super().create(vals_list)
 
-        record.action_return_material()
+        # validates every line and recomputes the affected MOs once
+        records.action_return_material()
 
-        if record.production_id:
-            record.production_id._compute_rm_return_qty()
-            record.production_id._compute_pmemo()
-
-        return record
+        return records
 
     # --------------------------------------------------
     # Write
@@ -167,9 +178,22 @@ class MrpRmReturnLine(models.Model):
         res = super().write(vals)
 
         if any(field in vals for field in ['quantity', 'state']):
-            for rec in self:
-                if rec.production_id:
-                    rec.production_id._compute_rm_return_qty()
-                    rec.production_id._compute_pmemo()
+            productions = self.production_id
+            if productions:
+                productions._compute_rm_return_qty()
+                productions._compute_pmemo()
+                if 'quantity' in vals:
+                    self.env['mrp.production.rm.line']._refresh_productions(productions)
+
+        return res
+
+    # --------------------------------------------------
+    # Unlink
+    # --------------------------------------------------
 
+    def unlink(self):
+        productions = self.production_id
+        res = super().unlink()
+        if productions:
+            self.env['mrp.production.rm.line']._refresh_productions(productions)
         return res
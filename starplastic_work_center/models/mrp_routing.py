@@ -1,6 +1,8 @@
 from odoo import api, models, fields
 from odoo.exceptions import ValidationError
 
+from .mrp_workcenter_deviation import DEVIATION_ROUTING_FIELDS
+
 
 class MrpRoutingWorkcenter(models.Model):
     _inherit = 'mrp.routing.workcenter'
@@ -89,4 +91,16 @@ class MrpRoutingWorkcenter(models.Model):
             if rec.standard_cycle_time is not None and rec.standard_cycle_time < 0:
                 raise ValidationError("Standard cycle time must be non-negative.")
             if rec.cycle_time_tolerance is not None and rec.cycle_time_tolerance < 0:
-                raise ValidationError("Cycle time tolerance must be non-negative.")
\ No newline at end of file
+                raise ValidationError("Cycle time tolerance must be non-negative.")
+
+    def write(self, vals):
+        res = super().write(vals)
+        # the deviation ledger stores the cavity and cycle time of the operation
+        if DEVIATION_ROUTING_FIELDS.intersection(vals):
+            self.env['work.center.deviation']._refresh_shifts_where("""
+                SELECT DISTINCT wcs.id
+                FROM work_center_shift wcs
+                JOIN mrp_workorder wo ON wo.production_id = wcs.production_id
+                WHERE wo.operation_id IN %s
+            """, (tuple(self.ids),))
+        return res
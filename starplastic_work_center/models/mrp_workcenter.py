@@ -21,4 +21,10 @@ class MrpWorkcenter(models.Model):
     machine_shift = fields.Selection([
         ('day', 'Day Night'),
         ('3shift', '3 Shift'),
-    ], string="Machine Shift")
\ No newline at end of file
+    ], string="Machine Shift")
+
+    def write(self, vals):
+        res = super().write(vals)
+        if 'max_power' in vals:
+            self.env['mrp.workcenter.daily.usage']._refresh_ideal(self)
+        return res
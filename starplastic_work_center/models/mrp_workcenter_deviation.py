@@ -0,0 +1,273 @@
+from odoo import api, fields, models
+
+# Shift fields the deviations are computed from; writing one refreshes the
+# deviations of the shift.
+DEVIATION_SHIFT_FIELDS = frozenset({
+    'date', 'production_id', 'mold_id', 'cavity', 'cycle_time_sec', 'store_inward_kg',
+    'cavity_acknowledged', 'cavity_reason_id', 'cavity_action', 'cavity_acknowledged_by',
+    'cycle_time_acknowledged', 'cycle_time_reason_id', 'cycle_time_action',
+    'cycle_time_acknowledged_by',
+    'unit_weight_acknowledged', 'unit_weight_reason_id', 'unit_weight_action',
+    'unit_weight_acknowledged_by',
+    'error_tolerance_acknowledged', 'error_tolerance_reason_id', 'error_tolerance_action',
+    'error_tolerance_acknowledged_by',
+})
+# Hourly entry fields the deviations are computed from.
+DEVIATION_ENTRY_FIELDS = frozenset({'shift_id', 'production_id', 'weight_gm', 'produced_weight_kg'})
+
+# Master data the deviations are computed from; writing one refreshes the
+# deviations of the shifts using it.
+DEVIATION_ROUTING_FIELDS = frozenset({'cavity', 'cycle_time'})
+DEVIATION_PRODUCT_FIELDS = frozenset({'weight_gm', 'weight', 'unit_weight_tolerance'})
+DEVIATION_WORKORDER_FIELDS = frozenset({'production_id', 'operation_id', 'workcenter_id'})
+
+DEVIATION_COLUMNS = (
+    'type', 'date', 'shift_id', 'hourly_entry_id', 'workorder_id', 'production_id',
+    'machine_id', 'product_id', 'time_slot', 'expected_value', 'actual_value', 'difference',
+    'difference_percent', 'tolerance', 'hourly_target',
+    'acknowledged', 'reason_id', 'action', 'acknowledged_by',
+    'create_uid', 'create_date', 'write_uid', 'write_date',
+)
+# A deviation is identified by these columns: it is updated in place and
+# keeps its id (and so the report row id) as long as it exists.
+DEVIATION_KEY = "type, shift_id, (COALESCE(hourly_entry_id, 0)), (COALESCE(workorder_id, 0))"
+DEVIATION_UPSERT = """
+    INSERT INTO work_center_deviation (%(columns)s) %%s
+    ON CONFLICT (%(key)s) DO UPDATE SET %(update)s
+    RETURNING id
+""" % {
+    'columns': ', '.join(DEVIATION_COLUMNS),
+    'key': DEVIATION_KEY,
+    'update': ', '.join(
+        '%s = EXCLUDED.%s' % (column, column) for column in DEVIATION_COLUMNS
+        if column not in ('type', 'shift_id', 'hourly_entry_id', 'workorder_id',
+                          'create_uid', 'create_date')
+    ),
+}
+
+# One SELECT per deviation type, restricted to the shifts being refreshed.
+DEVIATION_QUERIES = {
+    'cavity': """
+        SELECT
+            'cavity', wcs.date, wcs.id, NULL, wo.id, mo.id,
+            wo.workcenter_id, wcs.mold_id, NULL,
+            rwc.cavity, wcs.cavity, COALESCE(wcs.cavity, 0) - COALESCE(rwc.cavity, 0),
+            NULL, NULL, NULL,
+            COALESCE(wcs.cavity_acknowledged, false), wcs.cavity_reason_id,
+            wcs.cavity_action, wcs.cavity_acknowledged_by,
+            %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+        FROM work_center_shift wcs
+        JOIN mrp_production mo ON mo.id = wcs.production_id
+        JOIN mrp_workorder wo ON wo.production_id = mo.id
+        JOIN mrp_routing_workcenter rwc ON rwc.id = wo.operation_id
+        WHERE wcs.id IN %(shift_ids)s
+            AND COALESCE(wcs.cavity, 0) != COALESCE(rwc.cavity, 0)
+    """,
+    'cycle_time': """
+        SELECT
+            'cycle_time', wcs.date, wcs.id, NULL, wo.id, mo.id,
+            wo.workcenter_id, wcs.mold_id, NULL,
+            rwc.cycle_time, wcs.cycle_time_sec,
+            COALESCE(wcs.cycle_time_sec, 0) - COALESCE(rwc.cycle_time, 0),
+            NULL, pt.unit_weight_tolerance, wcs.hourly_target_qty,
+            COALESCE(wcs.cycle_time_acknowledged, false), wcs.cycle_time_reason_id,
+            wcs.cycle_time_action, wcs.cycle_time_acknowledged_by,
+            %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+        FROM work_center_shift wcs
+        JOIN mrp_production mo ON mo.id = wcs.production_id
+        JOIN mrp_workorder wo ON wo.production_id = mo.id
+        JOIN mrp_routing_workcenter rwc ON rwc.id = wo.operation_id
+        JOIN product_product pp ON pp.id = wcs.mold_id
+        JOIN product_template pt ON pt.id = pp.product_tmpl_id
+        WHERE wcs.id IN %(shift_ids)s
+            AND COALESCE(wcs.cycle_time_sec, 0) != COALESCE(rwc.cycle_time, 0)
+    """,
+    'unit_weight': """
+        SELECT
+            'unit_weight', DATE(whe.create_date), ws.id, whe.id, wo.id, mo.id,
+            whe.workcenter_id, mo.product_id, whe.time,
+            pt.weight, whe.unit_weight, whe.unit_weight - pt.weight,
+            NULL, COALESCE(pt.unit_weight_tolerance, 0), NULL,
+            COALESCE(ws.unit_weight_acknowledged, false), ws.unit_weight_reason_id,
+            ws.unit_weight_action, ws.unit_weight_acknowledged_by,
+            %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+        FROM work_center_hourly_entry whe
+        JOIN work_center_shift ws ON ws.id = whe.shift_id
+        JOIN mrp_production mo ON mo.id = whe.production_id
+        JOIN product_product pp ON pp.id = mo.product_id
+        JOIN product_template pt ON pt.id = pp.product_tmpl_id
+        -- one row per entry: the first work order only names the operation
+        LEFT JOIN LATERAL (
+            SELECT id FROM mrp_workorder
+            WHERE production_id = mo.id
+            ORDER BY id
+            LIMIT 1
+        ) wo ON true
+        WHERE ws.id IN %(shift_ids)s
+            AND whe.unit_weight IS NOT NULL
+            AND pt.weight IS NOT NULL
+            -- tolerance is a +/- band in the unit of the product weight (kg)
+            AND ABS(whe.unit_weight - pt.weight) > COALESCE(pt.unit_weight_tolerance, 0)
+    """,
+    'error_set': """
+        SELECT
+            'error_set', wcs.date, wcs.id, NULL, MIN(wo.id), mo.id,
+            wo.workcenter_id, mo.product_id, NULL,
+            COALESCE(wcs.store_inward_kg, 0), COALESCE(prod.kg, 0),
+            COALESCE(prod.kg, 0) - COALESCE(wcs.store_inward_kg, 0),
+            CASE
+                WHEN COALESCE(prod.kg, 0) = 0 THEN 0
+                ELSE ROUND(
+                    ((COALESCE(prod.kg, 0) - COALESCE(wcs.store_inward_kg, 0)) / prod.kg)::numeric * 100,
+                    2
+                )
+            END,
+            NULL, NULL,
+            COALESCE(wcs.error_tolerance_acknowledged, false), wcs.error_tolerance_reason_id,
+            wcs.error_tolerance_action, wcs.error_tolerance_acknowledged_by,
+            %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+        FROM work_center_shift wcs
+        JOIN mrp_production mo ON mo.id = wcs.production_id
+        JOIN mrp_workorder wo ON wo.production_id = mo.id
+        LEFT JOIN (
+            SELECT shift_id, SUM(produced_weight_kg) AS kg
+            FROM work_center_hourly_entry
+            WHERE shift_id IN %(shift_ids)s
+            GROUP BY shift_id
+        ) prod ON prod.shift_id = wcs.id
+        WHERE wcs.id IN %(shift_ids)s
+        GROUP BY wcs.id, mo.id, wo.workcenter_id, prod.kg
+    """,
+}
+
+
+class WorkCenterDeviation(models.Model):
+    _name = 'work.center.deviation'
+    _description = 'Shop Floor Deviation'
+    _order = 'date desc, id desc'
+
+    type = fields.Selection(
+        [
+            ('cavity', 'Running Cavity'),
+            ('cycle_time', 'Cycle Time'),
+            ('unit_weight', 'Unit Weight'),
+            ('error_set', 'Error Set'),
+        ],
+        required=True,
+        readonly=True
+    )
+    date = fields.Date(readonly=True)
+    shift_id = fields.Many2one(
+        'work.center.shift',
+        string='Shift',
+        required=True,
+        ondelete='cascade',
+        index=True,
+        readonly=True
+    )
+    hourly_entry_id = fields.Many2one(
+        'work.center.hourly.entry',
+        string='Hourly Entry',
+        ondelete='cascade',
+        readonly=True
+    )
+    # part of the ledger key, so the rows go with their source instead of colliding on NULL
+    workorder_id = fields.Many2one(
+        'mrp.workorder',
+        string='Work Order',
+        ondelete='cascade',
+        readonly=True
+    )
+    production_id = fields.Many2one(
+        'mrp.production',
+        string='MO',
+        ondelete='cascade',
+        readonly=True
+    )
+    # set late on the MO (from lot_producing_id), so read live
+    lot_id = fields.Many2one(related='production_id.lot_id', string='Batch Number')
+    machine_id = fields.Many2one('mrp.workcenter', string='Machine', readonly=True)
+    product_id = fields.Many2one('product.product', string='Item', readonly=True)
+    time_slot = fields.Char(string='Time Slot', readonly=True)
+
+    expected_value = fields.Float(string='Expected', readonly=True)
+    actual_value = fields.Float(string='Actual', readonly=True)
+    difference = fields.Float(string='Difference', readonly=True)
+    difference_percent = fields.Float(string='Difference %', readonly=True)
+    tolerance = fields.Float(string='Tolerance (+/-)', readonly=True)
+    hourly_target = fields.Float(string='Hourly Target', readonly=True)
+
+    acknowledged = fields.Boolean(readonly=True)
+    reason_id = fields.Many2one('running.cavity.reason', string='Reason', readonly=True)
+    action = fields.Char(string='Action', readonly=True)
+    acknowledged_by = fields.Many2one('res.users', string='Action By', readonly=True)
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS work_center_deviation_type_ack_date_idx
+                ON work_center_deviation (type, acknowledged, date)
+        """)
+        self.env.cr.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS work_center_deviation_key_uniq
+                ON work_center_deviation (%s)
+        """ % DEVIATION_KEY)
+
+    def _flush_deviation_sources(self):
+        self.env['work.center.shift'].flush_model()
+        self.env['work.center.hourly.entry'].flush_model(
+            ['shift_id', 'production_id', 'workcenter_id', 'time', 'unit_weight', 'produced_weight_kg']
+        )
+        self.env['mrp.workorder'].flush_model(list(DEVIATION_WORKORDER_FIELDS))
+        self.env['mrp.routing.workcenter'].flush_model(list(DEVIATION_ROUTING_FIELDS))
+        self.env['product.template'].flush_model(['weight', 'unit_weight_tolerance'])
+        self.flush_model()
+
+    @api.model
+    def _refresh_shifts(self, shift_ids):
+        """Recompute every deviation of the given shifts.
+
+        Deviations still produced are updated in place, new ones inserted
+        and the ones no longer produced deleted.
+        """
+        shift_ids = sorted({shift_id for shift_id in shift_ids if shift_id})
+        if not shift_ids:
+            return
+        self._flush_deviation_sources()
+        for index in range(0, len(shift_ids), 1000):
+            chunk = tuple(shift_ids[index:index + 1000])
+            params = {'uid': self.env.uid, 'shift_ids': chunk}
+            kept_ids = []
+            for query in DEVIATION_QUERIES.values():
+                self.env.cr.execute(DEVIATION_UPSERT % query, params)
+                kept_ids.extend(row[0] for row in self.env.cr.fetchall())
+            self.env.cr.execute("""
+                DELETE FROM work_center_deviation
+                WHERE shift_id IN %s AND NOT (id = ANY(%s))
+            """, (chunk, kept_ids))
+        self.invalidate_model()
+
+    @api.model
+    def _refresh_shifts_where(self, query, params):
+        """Refresh the shifts returned by ``query`` (a SELECT of shift ids)."""
+        self.env.cr.execute(query, params)
+        self._refresh_shifts([row[0] for row in self.env.cr.fetchall()])
+
+    @api.model
+    def _refresh_productions(self, production_ids):
+        """Refresh the shifts of the given production orders."""
+        production_ids = tuple(production_id for production_id in production_ids if production_id)
+        if production_ids:
+            self._refresh_shifts_where(
+                "SELECT id FROM work_center_shift WHERE production_id IN %s", (production_ids,)
+            )
+
+    @api.model
+    def _rebuild_deviations(self):
+        """Recompute the ledger for every shift (install, manual rebuild)."""
+        self._flush_deviation_sources()
+        self.env.cr.execute("SELECT id FROM work_center_shift")
+        shift_ids = [row[0] for row in self.env.cr.fetchall()]
+        self.env.cr.execute(
+            "DELETE FROM work_center_deviation WHERE NOT (shift_id = ANY(%s))", (shift_ids,)
+        )
+        self._refresh_shifts(shift_ids)
@@ -47,7 +47,6 @@ class WorkCenterShiftDowntimeSummary(models.Model):
     _name = 'work.center.shift.downtime.summary'
     _description = 'Downtime Summary'
     _order = 'hour_slot, reason_id'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
 
 
     shift_id = fields.Many2one(
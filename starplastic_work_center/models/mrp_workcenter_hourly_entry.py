@@ -1,6 +1,29 @@
-from odoo import api, fields, models, _
+from odoo import api, fields, models, tools, _
 from odoo.exceptions import ValidationError
 
+from .mrp_workcenter_deviation import DEVIATION_ENTRY_FIELDS
+from .mrp_workcenter_shift import ALL_HOUR_SLOTS
+
+# Bulk-entry mode: no per-field tracking values nor creation messages. The
+# shift keeps the audit trail as one digest posted when it is marked done.
+BULK_ENTRY_CONTEXT = {
+    'tracking_disable': True,
+    'mail_create_nolog': True,
+    'mail_notrack': True,
+}
+
+# Values accepted per slot / reason line by the shift-grid batch API.
+GRID_ENTRY_FIELDS = (
+    'time', 'target_qty', 'operator_one_id', 'operator_two_id', 'shut_down',
+    'produced_weight_kg', 'reject_weight_kg', 'rejection_reason', 'weight_gm',
+    'actual_cycle_time', 'qc_check', 'state', 'sync_uuid',
+)
+GRID_REASON_FIELDS = (
+    'reason_id', 'sub_reason_id', 'duration_minutes', 'actual_time_minutes', 'explanation',
+    'sync_uuid',
+)
+
+
 class WorkCenterHourlyEntry(models.Model):
     _name = 'work.center.hourly.entry'
     _description = 'Work Center Hourly Entry'
@@ -10,43 +33,19 @@ class WorkCenterHourlyEntry(models.Model):
 
     production_id = fields.Many2one('mrp.production', string='Production Order', ondelete='cascade', tracking=True)
 
-    def _fmt_ampm(self, hour_24):
-        suffix = "AM" if hour_24 < 12 else "PM"
-        hour_12 = 12 if hour_24 % 12 == 0 else hour_24 % 12
-        return f"{hour_12} {suffix}"
-    
     def _selection_hour_slots(self):
         """Return selection options. If shift_id present in context, return only that shift's slots;
-        otherwise return all 24 slots so the field is always selectable."""
+        otherwise return all 24 slots so the field is always selectable.
+        The slot tables are memoized, so this costs one read of the shift."""
         ctx = self.env.context or {}
         shift_id = ctx.get('default_shift_id') or ctx.get('shift_id')
+        if not shift_id or not isinstance(shift_id, int):
+            return list(ALL_HOUR_SLOTS)
 
-        def all_slots():
-            slots = []
-            for h in range(24):
-                next_h = (h + 1) % 24
-                key = f"{h:02d}-{next_h:02d}"
-                label = f"{self._fmt_ampm(h)} - {self._fmt_ampm(next_h)}"
-                slots.append((key, label))
-            return slots
-
-        if not shift_id:
-            return all_slots()
-
-        shift = self.env['work.center.shift'].browse(shift_id)
-        if not shift.exists() or not shift.template_id:
-            return all_slots()
-
-        start_hour = shift.template_id.start_hour
-        duration = shift.template_id.duration_hours or 8
-        slots = []
-        for i in range(duration):
-            hour = (start_hour + i) % 24
-            next_hour = (hour + 1) % 24
-            key = f"{hour:02d}-{next_hour:02d}"
-            label = f"{self._fmt_ampm(hour)} - {self._fmt_ampm(next_hour)}"
-            slots.append((key, label))
-        return slots
+        template = self.env['work.center.shift'].browse(shift_id).exists().template_id
+        if not template:
+            return list(ALL_HOUR_SLOTS)
+        return list(template._get_slot_table())
 
     @api.onchange('shift_id')
     def _onchange_shift_id(self):
@@ -84,6 +83,12 @@ class WorkCenterHourlyEntry(models.Model):
         'hourly_entry_id',
         string='Downtime Reasons',
     )
+    sync_uuid = fields.Char(
+        string='Sync Key',
+        copy=False,
+        readonly=True,
+        help="Idempotency key generated by the shop-floor tablet that created this entry."
+    )
 
     produced_weight_kg = fields.Float('Produced kg', tracking=True)
     produced_qty_number = fields.Float('Produced Nos', tracking=True, compute='_compute_produced_qty_number', store=True)
@@ -125,11 +130,76 @@ class WorkCenterHourlyEntry(models.Model):
         store=True
     )
 
+    # Stored downtime totals, kept up to date by the reason lines, so the
+    # production slip reads them without joining the lines.
+    workcenter_id = fields.Many2one(
+        'mrp.workcenter',
+        string='Machine',
+        compute='_compute_workcenter_id',
+        store=True
+    )
+    downtime_minutes = fields.Float(
+        string='Downtime (min)',
+        compute='_compute_downtime_totals',
+        store=True
+    )
+    product_downtime_minutes = fields.Float(
+        string='Product Efficiency Downtime (min)',
+        compute='_compute_downtime_totals',
+        store=True,
+        help="Downtime of the reasons flagged as affecting product efficiency."
+    )
+    downtime_reason_id = fields.Many2one(
+        'wc.downtime.reason',
+        string='Main Downtime Reason',
+        compute='_compute_downtime_totals',
+        store=True
+    )
+    downtime_sub_reason_id = fields.Many2one(
+        'wc.downtime.subreason',
+        string='Main Downtime Sub Reason',
+        compute='_compute_downtime_totals',
+        store=True
+    )
+
+    def init(self):
+        # unique(shift_id, time, production_id) lets NULL production orders repeat a slot
+        self.env.cr.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS work_center_hourly_entry_shift_time_no_production_uniq
+                ON work_center_hourly_entry (shift_id, time)
+                WHERE production_id IS NULL
+        """)
+        tools.create_index(
+            self.env.cr, 'work_center_hourly_entry_workcenter_date_idx', self._table,
+            ['workcenter_id', '(create_date::date)'],
+        )
+
+    @api.depends('shift_id.machine_id', 'production_id.workorder_ids.workcenter_id')
+    def _compute_workcenter_id(self):
+        for rec in self:
+            rec.workcenter_id = rec.shift_id.machine_id or rec.production_id.workorder_ids[:1].workcenter_id
+
+    @api.depends(
+        'reason_line_ids.duration_minutes',
+        'reason_line_ids.reason_id.affect_product_efficiency',
+        'reason_line_ids.sub_reason_id',
+    )
+    def _compute_downtime_totals(self):
+        for rec in self:
+            lines = rec.reason_line_ids
+            main_line = lines.sorted(lambda l: (-l.duration_minutes, l.id))[:1]
+            rec.downtime_minutes = sum(lines.mapped('duration_minutes'))
+            rec.product_downtime_minutes = sum(
+                lines.filtered(lambda l: l.reason_id.affect_product_efficiency).mapped('duration_minutes')
+            )
+            rec.downtime_reason_id = main_line.reason_id
+            rec.downtime_sub_reason_id = main_line.sub_reason_id
+
     @api.depends(
         'produced_qty_number',
         'reject_qty_number',
         'shift_id.hourly_target_qty',
-        'reason_line_ids.duration_minutes'
+        'downtime_minutes'
     )
     def _compute_efficiency(self):
         for rec in self:
@@ -152,7 +222,7 @@ class WorkCenterHourlyEntry(models.Model):
             # WORKER EFFICIENCY
             # -----------------------------
             produced_qty = rec.produced_qty_number or 0
-            downtime = sum(rec.reason_line_ids.mapped('duration_minutes')) or 0
+            downtime = rec.downtime_minutes or 0
 
             available_time = max(60 - downtime, 0)
 
@@ -216,17 +286,97 @@ class WorkCenterHourlyEntry(models.Model):
                 raise ValidationError(_("Cannot mark done: add at least one downtime reason."))
         self.write({'state': 'done'})
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            # Auto-assign the next available slot if not provided
+            if not vals.get('time'):
+                # Use context or vals to get production_id and shift_id
+                production_id = vals.get('production_id') or self._context.get('default_production_id')
+                shift_id = vals.get('shift_id') or self._context.get('default_shift_id')
+                slots = self.with_context(default_production_id=production_id, default_shift_id=shift_id)._selection_hour_slots()
+                if slots:
+                    vals['time'] = slots[0][0]
+        entries = super().create(vals_list)
+        self.env['work.center.deviation']._refresh_shifts(entries.shift_id.ids)
+        return entries
+
+    def _get_summary_slots(self):
+        return {(entry.shift_id.id, entry.time) for entry in self if entry.shift_id and entry.time}
+
+    def write(self, vals):
+        if not {'shift_id', 'time'}.union(DEVIATION_ENTRY_FIELDS).intersection(vals):
+            return super().write(vals)
+        slots = self._get_summary_slots()
+        shift_ids = set(self.shift_id.ids)
+        res = super().write(vals)
+        slots |= self._get_summary_slots()
+        shift_ids |= set(self.shift_id.ids)
+        if {'shift_id', 'time'}.intersection(vals):
+            self.env['work.center.shift']._sync_downtime_summary(slots)
+        if DEVIATION_ENTRY_FIELDS.intersection(vals):
+            self.env['work.center.deviation']._refresh_shifts(shift_ids)
+        return res
+
+    def unlink(self):
+        slots = self._get_summary_slots()
+        shift_ids = self.shift_id.ids
+        res = super().unlink()
+        self.env['work.center.shift']._sync_downtime_summary(slots)
+        self.env['work.center.deviation']._refresh_shifts(shift_ids)
+        return res
+
     @api.model
-    def create(self, vals):
-        # Auto-assign the next available slot if not provided
-        if not vals.get('time'):
-            # Use context or vals to get production_id and shift_id
-            production_id = vals.get('production_id') or self._context.get('default_production_id')
-            shift_id = vals.get('shift_id') or self._context.get('default_shift_id')
-            slots = self.with_context(default_production_id=production_id, default_shift_id=shift_id)._selection_hour_slots()
-            if slots:
-                vals['time'] = slots[0][0]
-        return super().create(vals)
+    def create_shift_grid(self, shift_id, slots):
+        """Create all hourly entries of a shift in one batch.
+
+        ``slots`` is a list of dicts holding the entry values (``time``,
+        operators, weights...) and an optional ``reason_lines`` list. The
+        whole grid is validated in memory before a single ``create``, so the
+        shift aggregates are recomputed once instead of once per slot.
+        Entries are created in bulk-entry mode (see ``BULK_ENTRY_CONTEXT``).
+        """
+        shift = self.env['work.center.shift'].browse(shift_id).exists()
+        if not shift:
+            raise ValidationError(_("Shift %s does not exist.", shift_id))
+
+        valid_slots = shift.template_id.get_time_keys() if shift.template_id else []
+        taken = set(shift.entry_ids.filtered(
+            lambda e: e.production_id == shift.production_id
+        ).mapped('time'))
+
+        errors = []
+        vals_list = []
+        for slot in slots:
+            time = slot.get('time')
+            if valid_slots and time not in valid_slots:
+                errors.append(_("%s: selected time slot must be within shift hours.", time))
+                continue
+            if time in taken:
+                errors.append(_("%s: this time slot is already taken for this shift.", time))
+                continue
+            taken.add(time)
+
+            reason_lines = [
+                {key: line[key] for key in GRID_REASON_FIELDS if key in line}
+                for line in slot.get('reason_lines') or []
+            ]
+            if slot.get('shut_down') and not reason_lines:
+                errors.append(_("%s: please add at least one downtime reason.", time))
+                continue
+
+            vals = {key: slot[key] for key in GRID_ENTRY_FIELDS if key in slot}
+            vals.update({
+                'shift_id': shift.id,
+                'production_id': shift.production_id.id,
+                'reason_line_ids': [(0, 0, line) for line in reason_lines],
+            })
+            vals_list.append(vals)
+
+        if errors:
+            raise ValidationError("\n".join(errors))
+
+        return self.with_context(default_shift_id=shift.id, **BULK_ENTRY_CONTEXT).create(vals_list)
 
     @api.onchange('shift_id', 'time')
     def _onchange_shift_time(self):
@@ -244,24 +394,22 @@ class WorkCenterHourlyEntry(models.Model):
     
     @api.constrains('shift_id', 'time')
     def _check_time_slot(self):
-        """Ensure time slot is within shift hours"""
+        """Ensure time slot is within shift hours.
+
+        Duplicate slots are rejected by the ``shift_time_production_uniq``
+        SQL constraint.
+        """
         for rec in self:
-            if rec.shift_id and rec.shift_id.template_id and rec.time:
-                valid_slots = rec.shift_id.template_id.get_time_keys()
-                if rec.time not in valid_slots:
-                    raise ValidationError(_("Selected time slot must be within shift hours."))
-
-                # Check for duplicate entries
-                domain = [
-                    ('shift_id', '=', rec.shift_id.id),
-                    ('time', '=', rec.time),
-                    ('id', '!=', rec.id)
-                ]
-                if rec.production_id:
-                    domain.append(('production_id', '=', rec.production_id.id))
-                
-                if self.search_count(domain):
-                    raise ValidationError(_("This time slot is already taken for this shift."))
+            template = rec.shift_id.template_id
+            if template and rec.time and rec.time not in template.get_time_keys():
+                raise ValidationError(_("Selected time slot must be within shift hours."))
+
+    _sql_constraints = [
+        ('shift_time_production_uniq', 'unique(shift_id, time, production_id)',
+         'This time slot is already taken for this shift.'),
+        ('sync_uuid_uniq', 'unique(sync_uuid)',
+         'This hourly entry has already been synchronised.'),
+    ]
 
 class WorkCenterHourlyEntryReasonLine(models.Model):
     _name = 'work.center.hourly.entry.reason.line'
@@ -285,3 +433,33 @@ class WorkCenterHourlyEntryReasonLine(models.Model):
     )
     actual_time_minutes = fields.Float('Actual Time (min)')
     explanation = fields.Char(string="Explanation")
+    sync_uuid = fields.Char(string='Sync Key', copy=False, readonly=True)
+
+    _sql_constraints = [
+        ('sync_uuid_uniq', 'unique(sync_uuid)',
+         'This downtime reason has already been synchronised.'),
+    ]
+
+    def _get_summary_slots(self):
+        return self.hourly_entry_id._get_summary_slots()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        self.env['work.center.shift']._sync_downtime_summary(lines._get_summary_slots())
+        return lines
+
+    def write(self, vals):
+        if not {'hourly_entry_id', 'reason_id', 'sub_reason_id', 'duration_minutes'}.intersection(vals):
+            return super().write(vals)
+        slots = self._get_summary_slots()
+        res = super().write(vals)
+        slots |= self._get_summary_slots()
+        self.env['work.center.shift']._sync_downtime_summary(slots)
+        return res
+
+    def unlink(self):
+        slots = self._get_summary_slots()
+        res = super().unlink()
+        self.env['work.center.shift']._sync_downtime_summary(slots)
+        return res
@@ -1,6 +1,39 @@
+from functools import lru_cache
+
+from markupsafe import Markup
+
 from odoo import api, fields, models, _
 from odoo.exceptions import ValidationError
 
+from .mrp_workcenter_deviation import DEVIATION_SHIFT_FIELDS
+
+
+def _fmt_ampm(hour_24):
+    suffix = "AM" if hour_24 < 12 else "PM"
+    hour_12 = 12 if hour_24 % 12 == 0 else hour_24 % 12
+    return f"{hour_12} {suffix}"
+
+
+def _hour_slot(hour):
+    """Return the (key, label) selection pair of the slot starting at ``hour``."""
+    hour = hour % 24
+    next_hour = (hour + 1) % 24
+    return (f"{hour:02d}-{next_hour:02d}", f"{_fmt_ampm(hour)} - {_fmt_ampm(next_hour)}")
+
+
+# The 24 slots of a day, built once at import.
+ALL_HOUR_SLOTS = tuple(_hour_slot(hour) for hour in range(24))
+
+
+@lru_cache(maxsize=None)
+def _slot_table(start_hour, duration_hours):
+    """Return the (key, label) slots of a shift, in shift order.
+
+    A pure function of the template hours, so it is memoized per process
+    and never needs to be invalidated.
+    """
+    return tuple(_hour_slot(start_hour + i) for i in range(duration_hours or 8))
+
 
 class WCShiftTemplate(models.Model):
     _name = 'wc.shift.template'
@@ -61,17 +94,15 @@ class WCShiftTemplate(models.Model):
             elif rec.code == 'T':
                 rec.start_hour = 22  # 10 PM to 6 AM
 
+    def _get_slot_table(self):
+        """Return the (key, label) slots of the template, in shift order."""
+        self.ensure_one()
+        return _slot_table(self.start_hour, self.duration_hours)
+
     def get_time_keys(self):
-        """Return 8 time keys for the shift."""
+        """Return the time keys of the shift."""
         self.ensure_one()
-        keys = []
-        start = self.start_hour
-        for i in range(8):  # 8-hour shift
-            hour = (start + i) % 24
-            next_hour = (hour + 1) % 24
-            key = f"{hour:02d}-{next_hour:02d}"
-            keys.append(key)
-        return keys
+        return [key for key, label in self._get_slot_table()]
 
 
 class WCShift(models.Model):
@@ -208,17 +239,15 @@ class WCShift(models.Model):
             rec.minimum_target_nos = round(min_nos, 0)
             rec.minimum_target_kg = round(min_nos * unit_weight, 2)
 
-    @api.depends('production_id', 'production_id.product_qty', 'total_produced_qty')
+    @api.depends('production_id.product_qty', 'production_id.total_shift_produced_qty')
     def _compute_remaining_qty(self):
+        # total_shift_produced_qty is kept once per MO, so all shifts of a
+        # production order share a single aggregate instead of re-searching it.
         for rec in self:
-            if rec.production_id:
-                total_produced = sum(
-                    self.search([
-                        ('production_id', '=', rec.production_id.id)
-                    ]).mapped('total_produced_qty')
-                )
+            production = rec.production_id
+            if production:
                 rec.remaining_qty = max(
-                    rec.production_id.product_qty - total_produced, 0
+                    production.product_qty - production.total_shift_produced_qty, 0
                 )
             else:
                 rec.remaining_qty = 0
@@ -228,40 +257,78 @@ class WCShift(models.Model):
         'work.center.shift.downtime.summary',
         'shift_id',
         string='Downtime Reasons Summary',
-        compute='_compute_downtime_summary',
-        store=True
+        readonly=True
     )
 
-    @api.depends(
-        'entry_ids.time',
-        'entry_ids.reason_line_ids.reason_id',
-        'entry_ids.reason_line_ids.sub_reason_id',
-        'entry_ids.reason_line_ids.duration_minutes',
-    )
-    def _compute_downtime_summary(self):
-        for shift in self:
-            shift.downtime_summary_ids = [(5, 0, 0)]
-            summary = {}
-
-            for entry in shift.entry_ids:
-                for line in entry.reason_line_ids:
-                    key = (
-                        entry.time,
-                        line.reason_id.id,
-                        line.sub_reason_id.id or False
-                    )
-                    summary[key] = summary.get(key, 0.0) + (line.duration_minutes or 0.0)
-
-            records = []
-            for (hour_slot, reason_id, sub_reason_id), total in summary.items():
-                records.append((0, 0, {
-                    'hour_slot': hour_slot,
-                    'reason_id': reason_id,
-                    'sub_reason_id': sub_reason_id,
-                    'total_duration': total,
-                }))
-
-            shift.downtime_summary_ids = records
+    def _sync_downtime_summary(self, slots=None):
+        """Bring the downtime summary of the given (shift_id, hour slot) pairs
+        up to date: changed keys are updated, new keys created and vanished
+        keys removed. Without ``slots`` every slot of ``self`` is synced."""
+        full = slots is None
+        self.env['work.center.hourly.entry'].flush_model(['shift_id', 'time'])
+        self.env['work.center.hourly.entry.reason.line'].flush_model(
+            ['hourly_entry_id', 'reason_id', 'sub_reason_id', 'duration_minutes']
+        )
+        if full:
+            slots = {(entry.shift_id.id, entry.time) for entry in self.entry_ids if entry.time}
+            shift_ids = set(self.ids)
+        else:
+            slots = {(shift_id, time) for shift_id, time in slots if shift_id and time}
+            shift_ids = {shift_id for shift_id, time in slots}
+        if not shift_ids:
+            return
+
+        totals = {}
+        if slots:
+            self.env.cr.execute("""
+                SELECT
+                    whe.shift_id,
+                    whe.time,
+                    rl.reason_id,
+                    rl.sub_reason_id,
+                    SUM(COALESCE(rl.duration_minutes, 0))
+                FROM work_center_hourly_entry_reason_line rl
+                JOIN work_center_hourly_entry whe
+                    ON whe.id = rl.hourly_entry_id
+                WHERE
+                    whe.shift_id IN %s
+                    AND (whe.shift_id, whe.time) IN %s
+                GROUP BY 1, 2, 3, 4
+            """, (tuple(shift_ids), tuple(slots)))
+            for shift_id, time, reason_id, sub_reason_id, total in self.env.cr.fetchall():
+                totals[(shift_id, time, reason_id or False, sub_reason_id or False)] = total
+
+        Summary = self.env['work.center.shift.downtime.summary']
+        existing = Summary.search([('shift_id', 'in', list(shift_ids))])
+        if not full:
+            existing = existing.filtered(lambda s: (s.shift_id.id, s.hour_slot) in slots)
+
+        to_unlink = Summary
+        for summary in existing:
+            key = (
+                summary.shift_id.id,
+                summary.hour_slot,
+                summary.reason_id.id,
+                summary.sub_reason_id.id,
+            )
+            if key not in totals:
+                to_unlink |= summary
+                continue
+            total = totals.pop(key)
+            if summary.total_duration != total:
+                summary.total_duration = total
+
+        to_unlink.unlink()
+        Summary.create([
+            {
+                'shift_id': shift_id,
+                'hour_slot': hour_slot,
+                'reason_id': reason_id,
+                'sub_reason_id': sub_reason_id,
+                'total_duration': total,
+            }
+            for (shift_id, hour_slot, reason_id, sub_reason_id), total in totals.items()
+        ])
 
     # =========================
     # COMPUTE
@@ -394,5 +461,57 @@ class WCShift(models.Model):
                 target = round((3600.0 / rec.cycle_time_sec) * rec.cavity, 0)
             rec.hourly_target_qty = target
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        shifts = super().create(vals_list)
+        self.env['work.center.deviation']._refresh_shifts(shifts.ids)
+        return shifts
+
+    def write(self, vals):
+        res = super().write(vals)
+        if DEVIATION_SHIFT_FIELDS.intersection(vals):
+            self.env['work.center.deviation']._refresh_shifts(self.ids)
+        return res
+
+    def _post_entry_digest(self):
+        """Post one chatter message per shift summarising its hourly entries.
+
+        Stands in for the per-field tracking skipped by bulk-entry mode.
+        """
+        for shift in self:
+            if not shift.entry_ids:
+                continue
+            order = {key: index for index, key in enumerate(
+                shift.template_id.get_time_keys() if shift.template_id else []
+            )}
+            entries = shift.entry_ids.sorted(lambda e: (order.get(e.time, len(order)), e.id))
+            labels = dict(entries._fields['time']._description_selection(self.env))
+            rows = Markup().join(
+                Markup(
+                    "<tr><td>%s</td><td>%s</td><td>%s</td><td>%s</td>"
+                    "<td>%s</td><td>%s</td><td>%s</td></tr>"
+                ) % (
+                    labels.get(entry.time, entry.time or ''),
+                    ", ".join(filter(None, [entry.operator_one_id.name, entry.operator_two_id.name])),
+                    entry.produced_weight_kg,
+                    entry.produced_qty_number,
+                    entry.reject_weight_kg,
+                    sum(entry.reason_line_ids.mapped('duration_minutes')),
+                    ", ".join(entry.reason_line_ids.reason_id.mapped('name')),
+                )
+                for entry in entries
+            )
+            shift.message_post(body=Markup(
+                "<p>%s</p><table class='table table-sm'><thead><tr>"
+                "<th>%s</th><th>%s</th><th>%s</th><th>%s</th><th>%s</th><th>%s</th><th>%s</th>"
+                "</tr></thead><tbody>%s</tbody></table>"
+            ) % (
+                _("Shift closed with %s hourly entries.", len(entries)),
+                _("Slot"), _("Operators"), _("Produced kg"), _("Produced Nos"),
+                _("Rejection kg"), _("Downtime (min)"), _("Reasons"),
+                rows,
+            ))
+
     def action_done(self):
-        self.write({'state': 'done'})
\ No newline at end of file
+        self.write({'state': 'done'})
+        self._post_entry_digest()
\ No newline at end of file
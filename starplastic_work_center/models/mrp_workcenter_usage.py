@@ -0,0 +1,142 @@
+from odoo import api, fields, models
+
+
+class MrpWorkcenterDailyUsage(models.Model):
+    _name = 'mrp.workcenter.daily.usage'
+    _description = 'Daily Machine Usage Ledger'
+    _order = 'date desc, workcenter_id'
+
+    date = fields.Date(string='Date', required=True, index=True, readonly=True)
+    workcenter_id = fields.Many2one(
+        'mrp.workcenter',
+        string='Machine',
+        required=True,
+        ondelete='cascade',
+        index=True,
+        readonly=True
+    )
+    machine_minutes = fields.Float(string='Machine Minutes', readonly=True)
+    workorder_count = fields.Integer(string='Finished Work Orders', readonly=True)
+    ideal_kwh = fields.Float(string='Ideal Unit Used', readonly=True)
+
+    _sql_constraints = [
+        ('date_workcenter_uniq', 'unique(date, workcenter_id)',
+         'Only one usage row is allowed per machine and day.'),
+    ]
+
+    def _flush_usage_sources(self):
+        self.env['mrp.workorder'].flush_model(['workcenter_id', 'date_finished', 'duration'])
+        self.env['mrp.workcenter'].flush_model(['max_power'])
+        self.flush_model()
+
+    @api.model
+    def _refresh_usage(self, keys):
+        """Recompute the ledger rows of the given (date, workcenter_id) keys."""
+        keys = tuple({(date, wc_id) for date, wc_id in keys if date and wc_id})
+        if not keys:
+            return
+
+        self._flush_usage_sources()
+        dates = [date for date, wc_id in keys]
+        workcenter_ids = tuple({wc_id for date, wc_id in keys})
+
+        self.env.cr.execute("""
+            DELETE FROM mrp_workcenter_daily_usage
+            WHERE (date, workcenter_id) IN %s
+        """, (keys,))
+        self.env.cr.execute("""
+            INSERT INTO mrp_workcenter_daily_usage (
+                date, workcenter_id, machine_minutes, workorder_count, ideal_kwh,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT
+                wo.date_finished::date,
+                wo.workcenter_id,
+                COALESCE(SUM(wo.duration), 0),
+                COUNT(wo.id),
+                (COALESCE(SUM(wo.duration), 0) / 60.0) * COALESCE(wc.max_power, 0),
+                %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM mrp_workorder wo
+            JOIN mrp_workcenter wc ON wc.id = wo.workcenter_id
+            WHERE
+                wo.date_finished >= %(date_from)s
+                AND wo.date_finished < (%(date_to)s::date + 1)
+                AND wo.workcenter_id IN %(workcenter_ids)s
+                AND (wo.date_finished::date, wo.workcenter_id) IN %(keys)s
+            GROUP BY 1, 2, wc.max_power
+        """, {
+            'uid': self.env.uid,
+            'date_from': min(dates),
+            'date_to': max(dates),
+            'workcenter_ids': workcenter_ids,
+            'keys': keys,
+        })
+        self.invalidate_model()
+
+    @api.model
+    def _refresh_ideal(self, workcenters):
+        """Re-price the ledger rows of the given machines after a max_power change."""
+        if not workcenters:
+            return
+        self._flush_usage_sources()
+        self.env.cr.execute("""
+            UPDATE mrp_workcenter_daily_usage u
+            SET ideal_kwh = (u.machine_minutes / 60.0) * COALESCE(wc.max_power, 0),
+                write_uid = %s,
+                write_date = NOW() AT TIME ZONE 'UTC'
+            FROM mrp_workcenter wc
+            WHERE wc.id = u.workcenter_id
+                AND wc.id IN %s
+        """, (self.env.uid, tuple(workcenters.ids)))
+        self.invalidate_model(['ideal_kwh', 'write_uid', 'write_date'])
+
+    @api.model
+    def _rebuild_usage(self):
+        """Backfill the whole ledger from the work order history."""
+        self._flush_usage_sources()
+        self.env.cr.execute("DELETE FROM mrp_workcenter_daily_usage")
+        self.env.cr.execute("""
+            INSERT INTO mrp_workcenter_daily_usage (
+                date, workcenter_id, machine_minutes, workorder_count, ideal_kwh,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT
+                wo.date_finished::date,
+                wo.workcenter_id,
+                COALESCE(SUM(wo.duration), 0),
+                COUNT(wo.id),
+                (COALESCE(SUM(wo.duration), 0) / 60.0) * COALESCE(wc.max_power, 0),
+                %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM mrp_workorder wo
+            JOIN mrp_workcenter wc ON wc.id = wo.workcenter_id
+            WHERE wo.date_finished IS NOT NULL
+            GROUP BY 1, 2, wc.max_power
+        """, {'uid': self.env.uid})
+        self.invalidate_model()
+
+
+class MrpWorkcenterProductivity(models.Model):
+    _inherit = 'mrp.workcenter.productivity'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['mrp.workcenter.daily.usage']._refresh_usage(
+            records.workorder_id._get_usage_keys()
+        )
+        return records
+
+    def write(self, vals):
+        if not {'date_start', 'date_end', 'workorder_id'}.intersection(vals):
+            return super().write(vals)
+        keys = self.workorder_id._get_usage_keys()
+        res = super().write(vals)
+        keys |= self.workorder_id._get_usage_keys()
+        self.env['mrp.workcenter.daily.usage']._refresh_usage(keys)
+        return res
+
+    def unlink(self):
+        keys = self.workorder_id._get_usage_keys()
+        res = super().unlink()
+        self.env['mrp.workcenter.daily.usage']._refresh_usage(keys)
+        return res
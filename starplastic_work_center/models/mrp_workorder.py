@@ -1,7 +1,14 @@
-from odoo import api, models, fields
+from datetime import timedelta
+
+from odoo import api, models, fields, tools
 from odoo.exceptions import ValidationError
 import re
 
+from .mrp_workcenter_deviation import DEVIATION_WORKORDER_FIELDS
+
+USAGE_FIELDS = {'date_finished', 'duration', 'workcenter_id', 'state'}
+
+
 class MrpWorkorder(models.Model):
     _inherit = 'mrp.workorder'
 
@@ -32,6 +39,17 @@ class MrpWorkorder(models.Model):
         readonly=True
     )
 
+    expected_end_date = fields.Datetime(
+        string='Expected End Date',
+        compute='_compute_production_delay',
+        store=True
+    )
+    production_delay_minutes = fields.Integer(
+        string='Production Delay (Min)',
+        compute='_compute_production_delay',
+        store=True
+    )
+
     allowed_workcenter_ids = fields.Many2many(
         'mrp.workcenter',
         string="Allowed Machines",
@@ -64,35 +82,84 @@ class MrpWorkorder(models.Model):
 
             wo.duration_expected = duration
 
+    @api.depends('state', 'date_start', 'date_finished', 'duration_expected')
+    def _compute_production_delay(self):
+        for wo in self:
+            expected_end = False
+            delay = 0
+            # a zero expected duration still sets a baseline, as in the former report query
+            if wo.date_start:
+                expected_end = wo.date_start + timedelta(minutes=wo.duration_expected)
+                if wo.state == 'done' and wo.date_finished and wo.date_finished > expected_end:
+                    delay = round((wo.date_finished - expected_end).total_seconds() / 60)
+            wo.expected_end_date = expected_end
+            wo.production_delay_minutes = delay
+
+    def init(self):
+        # the production delay report only reads the delayed, unacknowledged work orders;
+        # the predicate is the WHERE clause of the report, word for word
+        tools.create_index(
+            self.env.cr, 'mrp_workorder_production_delay_open_idx', self._table,
+            ['date_start'],
+            where="state = 'done' AND date_finished > expected_end_date"
+                  " AND production_delay_acknowledged IS NOT TRUE",
+        )
+
     @api.depends('production_id.origin', 'product_id')
     def _compute_customer_order_qty(self):
+        so_names = {}
         for wo in self:
-            qty = 0.0
-
-            if wo.production_id and wo.production_id.origin:
-                match = re.search(r'\bS\d+\b', wo.production_id.origin)
-                if match:
-                    so_name = match.group(0)
-
-                    so = self.env['sale.order'].search(
-                        [('name', '=', so_name)],
-                        limit=1
-                    )
-
-                    if so:
-                        solines = so.order_line.filtered(
-                            lambda l: l.product_id == wo.product_id
-                        )
-                        qty = sum(solines.mapped('product_uom_qty'))
-
-            wo.customer_order_quantity = qty
+            match = re.search(r'\bS\d+\b', wo.production_id.origin or '')
+            so_names[wo] = match.group(0) if match else False
+        lines_map = self.env['mrp.production']._get_sale_lines_map(so_names.values())
+        for wo in self:
+            solines = lines_map.get((so_names[wo], wo.product_id.id), self.env['sale.order.line'])
+            wo.customer_order_quantity = sum(solines.mapped('product_uom_qty'))
 
-    @api.model
-    def create(self, vals):
+    @api.model_create_multi
+    def create(self, vals_list):
         """Assign creation_date automatically on record creation."""
-        if not vals.get('creation_date'):
-            vals['creation_date'] = fields.Datetime.now()
-        return super(MrpWorkorder, self).create(vals)
+        for vals in vals_list:
+            if not vals.get('creation_date'):
+                vals['creation_date'] = fields.Datetime.now()
+        workorders = super(MrpWorkorder, self).create(vals_list)
+        # imported or already finished work orders count in the usage ledger at once
+        if any(USAGE_FIELDS.intersection(vals) for vals in vals_list):
+            self.env['mrp.workcenter.daily.usage']._refresh_usage(workorders._get_usage_keys())
+        self.env['work.center.deviation']._refresh_productions(workorders.production_id.ids)
+        return workorders
+
+    def _get_usage_keys(self):
+        """Return the (finish date, machine) keys of the daily usage ledger."""
+        return {
+            (wo.date_finished.date(), wo.workcenter_id.id)
+            for wo in self
+            if wo.date_finished and wo.workcenter_id
+        }
+
+    def write(self, vals):
+        refresh_usage = USAGE_FIELDS.intersection(vals)
+        refresh_deviation = DEVIATION_WORKORDER_FIELDS.intersection(vals)
+        if not (refresh_usage or refresh_deviation):
+            return super().write(vals)
+        keys = self._get_usage_keys() if refresh_usage else set()
+        productions = self.production_id
+        res = super().write(vals)
+        if refresh_usage:
+            keys |= self._get_usage_keys()
+            self.env['mrp.workcenter.daily.usage']._refresh_usage(keys)
+        if refresh_deviation:
+            productions |= self.production_id
+            self.env['work.center.deviation']._refresh_productions(productions.ids)
+        return res
+
+    def unlink(self):
+        keys = self._get_usage_keys()
+        productions = self.production_id
+        res = super().unlink()
+        self.env['mrp.workcenter.daily.usage']._refresh_usage(keys)
+        self.env['work.center.deviation']._refresh_productions(productions.ids)
+        return res
 
 
 class JobPartyWork(models.Model):
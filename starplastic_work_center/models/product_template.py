@@ -1,5 +1,8 @@
 from odoo import models, fields, api
 
+from .mrp_workcenter_deviation import DEVIATION_PRODUCT_FIELDS
+
+
 class ProductTemplate(models.Model):
     _inherit = 'product.template'
 
@@ -67,3 +70,16 @@ class ProductTemplate(models.Model):
     @api.onchange('weight_gm')
     def _onchange_weight_gm(self):
         self.weight = (self.weight_gm or 0.0) / 1000.0
+
+    def write(self, vals):
+        res = super().write(vals)
+        # the deviation ledger stores the unit weight of the moulded item and mold
+        if DEVIATION_PRODUCT_FIELDS.intersection(vals):
+            self.env['work.center.deviation']._refresh_shifts_where("""
+                SELECT DISTINCT wcs.id
+                FROM work_center_shift wcs
+                JOIN mrp_production mo ON mo.id = wcs.production_id
+                JOIN product_product pp ON pp.id IN (mo.product_id, wcs.mold_id)
+                WHERE pp.product_tmpl_id IN %s
+            """, (tuple(self.ids),))
+        return res
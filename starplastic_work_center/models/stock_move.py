@@ -0,0 +1,13 @@
+from odoo import models
+
+
+class StockMove(models.Model):
+    _inherit = 'stock.move'
+
+    def _action_done(self, cancel_backorder=False):
+        moves = super()._action_done(cancel_backorder=cancel_backorder)
+        productions = moves.raw_material_production_id
+        # mass close refreshes the lines of a whole chunk at once
+        if productions and not self.env.context.get('defer_rm_lines'):
+            self.env['mrp.production.rm.line']._refresh_productions(productions)
+        return moves
@@ -1,8 +1,10 @@
+from . import report_window
 from . import rm_loss_report
 from . import std_cycle_time_report
 from . import running_cavity_report
 from . import std_cycle_time_summary
 from . import running_cavity_summary
+from . import machine_downtime
 from . import machine_efficiency
 from . import production_shift_report
 from . import error_set_tolerance_report
@@ -12,5 +14,6 @@ from . import unit_weight_tolerance_report
 from . import unit_weight_tolerance_summary
 from . import production_delay_report
 from . import production_delay_summary
+from . import deviation_acknowledge_wizard
 from . import machine_data_report
 from . import power_consumption_analysis_report
@@ -0,0 +1,75 @@
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+
+# report model -> (field holding the acknowledged record, model of that record,
+# prefix of its acknowledgement fields, action log model, log field holding
+# the id of the acknowledged record)
+ACKNOWLEDGE_TARGETS = {
+    'running.cavity.report': ('shift_id', 'work.center.shift', 'cavity', 'running.cavity.action.log', 'report_id'),
+    'std.cycle.time.report': ('shift_id', 'work.center.shift', 'cycle_time', 'std.cycle.time.reason.log', 'report_key'),
+    'unit.weight.tolerance.report': ('shift_id', 'work.center.shift', 'unit_weight', 'unit.weight.tolerance.action.log', 'report_id'),
+    'error.set.tolerance.report': ('shift_id', 'work.center.shift', 'error_tolerance', 'error.set.tolerance.action.log', 'report_id'),
+    'production.delay.report': ('id', 'mrp.workorder', 'production_delay', 'production.delay.action.log', 'report_id'),
+}
+
+
+class DeviationAcknowledgeWizard(models.TransientModel):
+    _name = 'deviation.acknowledge.wizard'
+    _description = 'Acknowledge Deviations'
+
+    res_model = fields.Char(
+        default=lambda self: self.env.context.get('active_model'),
+        readonly=True
+    )
+    record_count = fields.Integer(
+        string='Selected Rows',
+        default=lambda self: len(self.env.context.get('active_ids') or []),
+        readonly=True
+    )
+    reason_id = fields.Many2one(
+        'running.cavity.reason',
+        string='Reason',
+        required=True
+    )
+    action = fields.Char(string='Action', required=True)
+
+    @api.model
+    def _target_ids(self, res_model, report_ids):
+        """Return the ids of the records acknowledged through the report rows."""
+        target_field = ACKNOWLEDGE_TARGETS[res_model][0]
+        if target_field == 'id':
+            return report_ids
+        rows = self.env[res_model].search_read(
+            [('id', 'in', report_ids)], [target_field], load=None
+        )
+        return list({row[target_field] for row in rows if row[target_field]})
+
+    def action_confirm(self):
+        """Acknowledge every selected row with one write and one log batch."""
+        self.ensure_one()
+        report_ids = self.env.context.get('active_ids') or []
+        if self.res_model not in ACKNOWLEDGE_TARGETS or not report_ids:
+            raise UserError(_("Select the report rows to acknowledge."))
+        target_field, target_model, prefix, log_model, log_key = ACKNOWLEDGE_TARGETS[self.res_model]
+
+        target_ids = self._target_ids(self.res_model, report_ids)
+        self.env[target_model].browse(target_ids).write({
+            '%s_acknowledged' % prefix: True,
+            '%s_reason_id' % prefix: self.reason_id.id,
+            '%s_action' % prefix: self.action,
+            '%s_acknowledged_by' % prefix: self.env.user.id,
+        })
+
+        # report row ids change on every refresh, the acknowledged record ids do not
+        log_vals = []
+        for target_id in target_ids:
+            vals = {
+                log_key: str(target_id) if log_key == 'report_key' else target_id,
+                'reason_id': self.reason_id.id,
+                'action': self.action,
+            }
+            if target_model == 'mrp.workorder':
+                vals['workorder_id'] = target_id
+            log_vals.append(vals)
+        self.env[log_model].create(log_vals)
+        return {'type': 'ir.actions.act_window_close'}
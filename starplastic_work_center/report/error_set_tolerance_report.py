@@ -90,72 +90,25 @@ class ErrorSetToleranceReport(models.Model):
 
 
     def init(self):
-        tools.drop_view_if_exists(self.env.cr, 'error_set_tolerance_report')
+        # a filter on the deviation ledger, see work.center.deviation
+        tools.drop_view_if_exists(self.env.cr, self._table)
         self.env.cr.execute("""
-            CREATE OR REPLACE VIEW error_set_tolerance_report AS (
+            CREATE VIEW error_set_tolerance_report AS (
                 SELECT
-                    row_number() OVER () AS id,
-
-                    wcs.date,
+                    d.id,
+                    d.date,
                     mo.name AS workorder_no,
-                    mo.product_id AS product_id,
-                    wo.workcenter_id AS workcenter_id,
-                    wcs.id AS shift_id,
-
-                    /* Workshop Production */
-                    COALESCE(SUM(whe.produced_weight_kg), 0)
-                        AS production_kg_workshop,
-
-                    /* Store Inward */
-                    COALESCE(wcs.store_inward_kg, 0)
-                        AS production_kg_store,
-
-                    /* Difference KG */
-                    (
-                        COALESCE(SUM(whe.produced_weight_kg), 0)
-                        - COALESCE(wcs.store_inward_kg, 0)
-                    ) AS difference_kg,
-
-                    /* Correct Difference Percentage */
-                    CASE
-                        WHEN COALESCE(SUM(whe.produced_weight_kg), 0) = 0 THEN 0
-                        ELSE
-                            ROUND(
-                                (
-                                    (
-                                        COALESCE(SUM(whe.produced_weight_kg), 0)::numeric
-                                        - COALESCE(wcs.store_inward_kg, 0)::numeric
-                                    )
-                                    /
-                                    NULLIF(
-                                        COALESCE(SUM(whe.produced_weight_kg), 0)::numeric,
-                                        0
-                                    )
-                                ) * 100,
-                                2
-                            )
-                    END AS difference_percent
-
-                FROM work_center_shift wcs
-
-                JOIN mrp_production mo
-                    ON mo.id = wcs.production_id
-
-                JOIN mrp_workorder wo
-                    ON wo.production_id = mo.id
-
-                LEFT JOIN work_center_hourly_entry whe
-                    ON whe.shift_id = wcs.id
-
-                WHERE COALESCE(wcs.error_tolerance_acknowledged, false) = false
-
-                GROUP BY
-                    wcs.id,
-                    wcs.date,
-                    mo.name,
-                    mo.product_id,
-                    wo.workcenter_id,
-                    wcs.store_inward_kg
+                    d.product_id,
+                    d.machine_id AS workcenter_id,
+                    d.shift_id,
+                    d.actual_value AS production_kg_workshop,
+                    d.expected_value AS production_kg_store,
+                    d.difference AS difference_kg,
+                    d.difference_percent
+                FROM work_center_deviation d
+                JOIN mrp_production mo ON mo.id = d.production_id
+                WHERE d.type = 'error_set'
+                    AND d.acknowledged = false
             )
         """)
 
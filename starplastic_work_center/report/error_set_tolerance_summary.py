@@ -38,69 +38,27 @@ class ErrorSetToleranceSummary(models.Model):
                 rec.shift_display = False
 
     def init(self):
-        tools.drop_view_if_exists(self.env.cr, 'error_set_tolerance_summary')
+        # a filter on the deviation ledger, see work.center.deviation
+        tools.drop_view_if_exists(self.env.cr, self._table)
         self.env.cr.execute("""
-            CREATE OR REPLACE VIEW error_set_tolerance_summary AS (
+            CREATE VIEW error_set_tolerance_summary AS (
                 SELECT
-                    row_number() OVER () AS id,
-
-                    wcs.date,
+                    d.id,
+                    d.date,
                     mo.name AS workorder_no,
-                    wo.workcenter_id AS machine_id,
-                    wcs.id AS shift_id,
-                    mo.product_id AS product_id,
-
-                    COALESCE(SUM(whe.produced_weight_kg), 0)
-                        AS production_kg_workshop,
-
-                    COALESCE(wcs.store_inward_kg, 0)
-                        AS production_kg_store,
-
-                    COALESCE(SUM(whe.produced_weight_kg), 0)
-                        - COALESCE(wcs.store_inward_kg, 0)
-                        AS difference_kg,
-
-                    CASE
-                        WHEN COALESCE(SUM(whe.produced_weight_kg), 0) = 0 THEN 0
-                        ELSE
-                            ROUND(
-                                (
-                                    (
-                                        COALESCE(SUM(whe.produced_weight_kg), 0)
-                                        - COALESCE(wcs.store_inward_kg, 0)
-                                    )
-                                    / NULLIF(SUM(whe.produced_weight_kg), 0)
-                                )::numeric * 100,
-                                2
-                            )
-                    END AS difference_percent,
-
-                    wcs.error_tolerance_action AS action,
-                    wcs.error_tolerance_reason_id AS reason_id,
-                    wcs.error_tolerance_acknowledged_by AS action_by
-
-                FROM work_center_shift wcs
-
-                JOIN mrp_production mo
-                    ON mo.id = wcs.production_id
-
-                JOIN mrp_workorder wo
-                    ON wo.production_id = mo.id
-
-                LEFT JOIN work_center_hourly_entry whe
-                    ON whe.shift_id = wcs.id
-
-                WHERE COALESCE(wcs.error_tolerance_acknowledged, false) = true
-
-                GROUP BY
-                    wcs.id,
-                    wcs.date,
-                    mo.name,
-                    wo.workcenter_id,
-                    mo.product_id,
-                    wcs.store_inward_kg,
-                    wcs.error_tolerance_action,
-                    wcs.error_tolerance_reason_id,
-                    wcs.error_tolerance_acknowledged_by
+                    d.machine_id,
+                    d.shift_id,
+                    d.product_id,
+                    d.actual_value AS production_kg_workshop,
+                    d.expected_value AS production_kg_store,
+                    d.difference AS difference_kg,
+                    d.difference_percent,
+                    d.action,
+                    d.reason_id,
+                    d.acknowledged_by AS action_by
+                FROM work_center_deviation d
+                JOIN mrp_production mo ON mo.id = d.production_id
+                WHERE d.type = 'error_set'
+                    AND d.acknowledged = true
             )
         """)
@@ -37,7 +37,7 @@ class MachineDataReport(models.Model):
         self.env.cr.execute("""
             CREATE VIEW machine_data_report AS (
                 SELECT
-                    row_number() OVER() AS id,
+                    md.id AS id,
 
                     md.date,
                     md.workcenter_id,
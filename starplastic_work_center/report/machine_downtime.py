@@ -0,0 +1,90 @@
+from odoo import api, fields, models, tools
+
+
+class MrpMachineDowntime(models.Model):
+    _name = "mrp.machine.downtime"
+    _description = "Machine Downtime Analysis"
+    _auto = False
+    _order = "date desc, machine_id, reason_name"
+
+    date = fields.Date(readonly=True)
+    machine_id = fields.Many2one("mrp.workcenter", string="Machine", readonly=True)
+    reason_id = fields.Many2one("wc.downtime.reason", string="Reason", readonly=True)
+    sub_reason_id = fields.Many2one("wc.downtime.subreason", string="Sub Reason", readonly=True)
+    reason_name = fields.Char(string="Downtime", readonly=True)
+    source = fields.Selection(
+        [('entry', 'Hourly Entry'), ('productivity', 'Work Center Productivity')],
+        readonly=True
+    )
+    minutes = fields.Float(string="Minutes", readonly=True)
+
+    def init(self):
+        """Materialized long-format downtime: one row per machine, day and reason.
+
+        Hourly entry reason lines and productivity losses are aggregated in a
+        single pass; productivity descriptions are matched to the downtime
+        reasons by name, unknown ones are kept under their own description.
+        New reasons therefore show up without any schema change.
+        """
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute("""
+            CREATE MATERIALIZED VIEW mrp_machine_downtime AS (
+                -- id from the first source row of the group and its kind
+                -- (even: reason line, odd: productivity), stable across refreshes
+                SELECT
+                    dt.*
+                FROM (
+                    SELECT
+                        MIN(rl.id)::bigint * 2 AS id,
+                        s.date AS date,
+                        s.machine_id AS machine_id,
+                        rl.reason_id AS reason_id,
+                        rl.sub_reason_id AS sub_reason_id,
+                        COALESCE(r.name, 'Undefined') AS reason_name,
+                        'entry' AS source,
+                        SUM(rl.duration_minutes) AS minutes
+                    FROM work_center_hourly_entry_reason_line rl
+                    JOIN work_center_hourly_entry whe ON whe.id = rl.hourly_entry_id
+                    JOIN work_center_shift s ON s.id = whe.shift_id
+                    LEFT JOIN wc_downtime_reason r ON r.id = rl.reason_id
+                    WHERE s.machine_id IS NOT NULL
+                    GROUP BY s.date, s.machine_id, rl.reason_id, rl.sub_reason_id, r.name
+
+                    UNION ALL
+
+                    SELECT
+                        MIN(p.id)::bigint * 2 + 1 AS id,
+                        p.date_start::date AS date,
+                        p.workcenter_id AS machine_id,
+                        r.id AS reason_id,
+                        NULL::integer AS sub_reason_id,
+                        COALESCE(r.name, NULLIF(p.description, ''), 'Undefined') AS reason_name,
+                        'productivity' AS source,
+                        SUM(EXTRACT(EPOCH FROM (p.date_end - p.date_start))/60) AS minutes
+                    FROM mrp_workcenter_productivity p
+                    LEFT JOIN wc_downtime_reason r ON UPPER(r.name) = UPPER(p.description)
+                    WHERE p.date_end IS NOT NULL
+                    GROUP BY 2, 3, 4, 6
+                ) dt
+            )
+        """)
+        self.env.cr.execute("""
+            CREATE UNIQUE INDEX mrp_machine_downtime_id_uniq ON mrp_machine_downtime (id)
+        """)
+        self.env.cr.execute("""
+            CREATE INDEX mrp_machine_downtime_date_machine_idx
+                ON mrp_machine_downtime (date, machine_id)
+        """)
+
+    @api.model
+    def _refresh(self):
+        self.env['work.center.hourly.entry.reason.line'].flush_model(
+            ['hourly_entry_id', 'reason_id', 'sub_reason_id', 'duration_minutes']
+        )
+        self.env['work.center.hourly.entry'].flush_model(['shift_id'])
+        self.env['work.center.shift'].flush_model(['date', 'machine_id'])
+        self.env['mrp.workcenter.productivity'].flush_model(
+            ['workcenter_id', 'date_start', 'date_end', 'description']
+        )
+        self.env.cr.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY mrp_machine_downtime")
+        self.invalidate_model()
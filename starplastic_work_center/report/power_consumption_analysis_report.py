@@ -25,15 +25,16 @@ class PowerConsumptionAnalysis(models.Model):
         self._cr.execute("""
             CREATE OR REPLACE VIEW mrp_power_consumption_analysis AS (
                 SELECT
-                    row_number() OVER() AS id,
+                    -- stable between calls, but computed: a lookup by id still reads the whole view
+                    (MIN(pc.id)::bigint << 32) + wc.id AS id,
 
                     pc.consumption_date,
                     pc.location_id,
 
                     wc.id as workcenter_id,
 
-                    -- Machine Minutes per Workcenter
-                    COALESCE(SUM(wo.duration), 0) as machine_minutes,
+                    -- Machine Minutes per Workcenter (daily usage ledger)
+                    COALESCE(SUM(u.machine_minutes), 0) as machine_minutes,
 
                     -- Global Values (not per machine)
                     MAX(pc.additional_load1) as additional_load1,
@@ -42,32 +43,24 @@ class PowerConsumptionAnalysis(models.Model):
                     MAX(pc.meter_reading) as actual_power_consumption,
 
                     -- Ideal Power (per machine)
-                    (
-                        (COALESCE(SUM(wo.duration), 0) / 60.0)
-                        * COALESCE(wc.max_power, 0)
-                    ) as ideal_meter_reading,
+                    COALESCE(SUM(u.ideal_kwh), 0) as ideal_meter_reading,
 
                     (
                         MAX(pc.meter_reading)
-                        -
-                        (
-                            (COALESCE(SUM(wo.duration), 0) / 60.0)
-                            * COALESCE(wc.max_power, 0)
-                        )
+                        - COALESCE(SUM(u.ideal_kwh), 0)
                     ) as difference
 
                 FROM mrp_power_consumption pc
 
                 CROSS JOIN mrp_workcenter wc
 
-                LEFT JOIN mrp_workorder wo
-                    ON wo.workcenter_id = wc.id
-                    AND wo.date_finished::date = pc.consumption_date
+                LEFT JOIN mrp_workcenter_daily_usage u
+                    ON u.workcenter_id = wc.id
+                    AND u.date = pc.consumption_date
 
                 GROUP BY
                     pc.consumption_date,
                     pc.location_id,
-                    wc.id,
-                    wc.max_power
+                    wc.id
             )
         """)
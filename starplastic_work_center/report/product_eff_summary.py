@@ -1,11 +1,14 @@
 from odoo import models, fields, tools
+from odoo.tools import SQL
 
 
 class ProductEfficiencySummary(models.Model):
     _name = 'product.efficiency.summary'
     _description = 'Product Efficiency Summary Report'
+    _inherit = 'report.window.mixin'
     _auto = False
     _order = 'date desc'
+    _window_machine_field = None
 
     date = fields.Date(string='Date')
 
@@ -37,11 +40,23 @@ class ProductEfficiencySummary(models.Model):
     efficiency = fields.Float(string='Efficiency (%)')
 
     def init(self):
+        # computed per search window, see report.window.mixin
         tools.drop_view_if_exists(self.env.cr, 'product_efficiency_summary')
+
+    def _window_for_ids(self, ids):
+        # ids are hourly entry ids and rows are grouped per entry day
         self.env.cr.execute("""
-            CREATE VIEW product_efficiency_summary AS (
+            SELECT MIN(create_date)::date, MAX(create_date)::date
+            FROM work_center_hourly_entry
+            WHERE id IN %s
+        """, (ids,))
+        date_from, date_to = self.env.cr.fetchone()
+        return {'date_from': date_from, 'date_to': date_to} if date_from else {}
+
+    def _window_query(self, window):
+        return SQL("""
                 SELECT
-                    row_number() OVER () AS id,
+                    MIN(whe.id) AS id,
 
                     DATE(whe.create_date) AS date,
                     pp.id AS product_id,
@@ -83,7 +98,7 @@ class ProductEfficiencySummary(models.Model):
                         ), 0
                     ) AS actual_production_per_hour,
 
-                    -- Efficiency %
+                    -- Efficiency (percent)
                     (
                         (
                             SUM(whe.produced_qty_number)
@@ -107,20 +122,24 @@ class ProductEfficiencySummary(models.Model):
                     ) * 100 AS efficiency,
 
                     -- Total Shutdown Minutes
-                    SUM(COALESCE(wher.duration_minutes, 0)) AS shutdown_minutes,
+                    SUM(COALESCE(whe.downtime_minutes, 0)) AS shutdown_minutes,
 
                     -- Last Shutdown Reason
-                    MAX(wher.reason_id) AS last_shutdown_reason_id
+                    MAX(whe.downtime_reason_id) AS last_shutdown_reason_id
 
                 FROM work_center_hourly_entry whe
 
-                LEFT JOIN work_center_hourly_entry_reason_line wher
-                    ON wher.hourly_entry_id = whe.id
                 LEFT JOIN mrp_production mo
                     ON mo.id = whe.production_id
 
-                LEFT JOIN mrp_workorder wo
-                    ON wo.production_id = mo.id
+                -- first operation of the MO, one row per entry
+                LEFT JOIN LATERAL (
+                    SELECT w.operation_id
+                    FROM mrp_workorder w
+                    WHERE w.production_id = mo.id
+                    ORDER BY w.id
+                    LIMIT 1
+                ) wo ON TRUE
 
                 LEFT JOIN mrp_routing_workcenter rw
                     ON rw.id = wo.operation_id
@@ -130,11 +149,12 @@ class ProductEfficiencySummary(models.Model):
                 LEFT JOIN product_template pt
                     ON pt.id = pp.product_tmpl_id
 
+                WHERE %s
+
                 GROUP BY
                     DATE(whe.create_date),
                     pp.id,
                     pt.weight,
                     mo.cavity,
                     rw.cycle_time
-            )
-        """)
+        """, self._window_where(window, datetime='whe.create_date', product='mo.product_id'))
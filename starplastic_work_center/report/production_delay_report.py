@@ -1,4 +1,5 @@
 from odoo import models, fields, tools
+from odoo.tools import SQL
 
 
 class MrpWorkorder(models.Model):
@@ -73,7 +74,9 @@ class ProductionDelayReasonWizard(models.TransientModel):
 class ProductionDelayReport(models.Model):
     _name = 'production.delay.report'
     _description = 'Production Delay Report'
+    _inherit = 'report.window.mixin'
     _auto = False
+    _window_date_field = 'wo_date'
 
     wo_date = fields.Date(string='W.O Date')
     wo_no = fields.Char(string='W.O No')
@@ -115,9 +118,21 @@ class ProductionDelayReport(models.Model):
         return self.action_hide()
 
     def init(self):
+        # computed per search window, see report.window.mixin
         tools.drop_view_if_exists(self.env.cr, 'production_delay_report')
+
+    def _window_for_ids(self, ids):
+        # ids are work order ids
         self.env.cr.execute("""
-            CREATE OR REPLACE VIEW production_delay_report AS (
+            SELECT MIN(date_start)::date, MAX(date_start)::date
+            FROM mrp_workorder
+            WHERE id IN %s
+        """, (ids,))
+        date_from, date_to = self.env.cr.fetchone()
+        return {'date_from': date_from, 'date_to': date_to} if date_from else {}
+
+    def _window_query(self, window):
+        return SQL("""
                 SELECT
                     wo.id AS id,
 
@@ -132,44 +147,24 @@ class ProductionDelayReport(models.Model):
 
                     wo.planned_start_date,
                     wo.date_start AS actual_start_date,
-
-                    -- Expected End Datetime
-                    (wo.date_start +
-                        (wo.duration_expected * interval '1 minute')
-                    ) AS exp_delivery_date,
-
+                    wo.expected_end_date AS exp_delivery_date,
                     wo.date_finished::date AS production_close_date,
                     wo.date_finished AS production_end_date,
-
-                    -- Delay in Minutes
-                    ROUND(
-                        EXTRACT(EPOCH FROM (
-                            wo.date_finished -
-                            (wo.date_start +
-                                (wo.duration_expected * interval '1 minute')
-                            )
-                        )) / 60
-                    )::integer AS production_delay
+                    wo.production_delay_minutes AS production_delay
 
                 FROM mrp_workorder wo
                 JOIN mrp_production mp
                     ON mp.id = wo.production_id
 
+                -- matches mrp_workorder_production_delay_open_idx
                 WHERE
                     wo.state = 'done'
-                    AND wo.date_start IS NOT NULL
-                    AND wo.date_finished IS NOT NULL
-                    AND wo.duration_expected IS NOT NULL
-
-                    -- IMPORTANT CONDITION:
-                    -- Show only if finished AFTER expected time
-                    AND wo.date_finished >
-                        (wo.date_start +
-                            (wo.duration_expected * interval '1 minute')
-                        )
-                    AND COALESCE(wo.production_delay_acknowledged, false) = false
-            )
-        """)
+                    AND wo.date_finished > wo.expected_end_date
+                    AND wo.production_delay_acknowledged IS NOT TRUE
+                    AND %s
+        """, self._window_where(
+            window, datetime='wo.date_start', machine='wo.workcenter_id', product='mp.product_id',
+        ))
 
 
 class ProductionDelayActionLog(models.Model):
@@ -43,26 +43,10 @@ class ProductionDelaySummary(models.Model):
                     mp.product_qty AS qty,
                     wo.planned_start_date,
                     wo.date_start AS actual_start_date,
-
-                    -- Expected End Date
-                    (
-                        wo.date_start +
-                        (wo.duration_expected * interval '1 minute')
-                    )::date AS exp_delivery_date,
-
+                    wo.expected_end_date::date AS exp_delivery_date,
                     wo.date_finished::date AS production_close_date,
                     wo.date_finished AS production_end_date,
-
-                    -- Delay in Minutes
-                    ROUND(
-                        EXTRACT(EPOCH FROM (
-                            wo.date_finished -
-                            (
-                                wo.date_start +
-                                (wo.duration_expected * interval '1 minute')
-                            )
-                        )) / 60
-                    )::integer AS production_delay,
+                    wo.production_delay_minutes AS production_delay,
 
                     wo.production_delay_reason_id AS reason_id,
                     wo.production_delay_acknowledged_by AS action_by,
@@ -73,17 +57,7 @@ class ProductionDelaySummary(models.Model):
 
                 WHERE
                     wo.state = 'done'
-                    AND wo.date_start IS NOT NULL
-                    AND wo.date_finished IS NOT NULL
-                    AND wo.duration_expected IS NOT NULL
-
-                    -- IMPORTANT: Only real delays
-                    AND wo.date_finished >
-                        (
-                            wo.date_start +
-                            (wo.duration_expected * interval '1 minute')
-                        )
-
-                    AND COALESCE(wo.production_delay_acknowledged, false) = true
+                    AND wo.date_finished > wo.expected_end_date
+                    AND wo.production_delay_acknowledged = true
             )
         """)
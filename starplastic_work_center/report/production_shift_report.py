@@ -64,10 +64,10 @@ class MrpProductionSlip(models.Model):
         self.env.cr.execute("""
             CREATE VIEW mrp_production_slip AS (
                 SELECT
-                    row_number() OVER() AS id,
+                    whe.id AS id,
 
                     DATE(whe.create_date) AS date,
-                    wo.workcenter_id,
+                    whe.workcenter_id,
                     whe.time AS time_slot,
                     whe.create_date AS log_time,
                     whe.production_id,
@@ -95,9 +95,9 @@ class MrpProductionSlip(models.Model):
                     whe.reject_weight_kg AS rejection_kg,
                     whe.rejection_reason,
 
-                    COALESCE(SUM(rl.duration_minutes), 0) AS shut_down_time,
-                    MAX(rl.reason_id) AS reason_id,
-                    MAX(rl.sub_reason_id) AS sub_reason_id,
+                    COALESCE(whe.downtime_minutes, 0) AS shut_down_time,
+                    whe.downtime_reason_id AS reason_id,
+                    whe.downtime_sub_reason_id AS sub_reason_id,
 
                     NULL::text AS explanation,
 
@@ -113,7 +113,7 @@ class MrpProductionSlip(models.Model):
                                 NULLIF((3600.0 / wo.duration_expected) * mo.cavity, 0)
                             )
                             -
-                            (COALESCE(SUM(rl.duration_minutes), 0) / 60.0)
+                            (COALESCE(whe.downtime_minutes, 0) / 60.0)
                         ELSE 0
                     END AS efficiency,
 
@@ -129,17 +129,7 @@ class MrpProductionSlip(models.Model):
                                 NULLIF((3600.0 / wo.duration_expected) * mo.cavity, 0)
                             )
                             -
-                            (
-                                COALESCE(
-                                    SUM(
-                                        CASE
-                                            WHEN r.affect_product_efficiency = TRUE
-                                            THEN rl.duration_minutes
-                                            ELSE 0
-                                        END
-                                    ), 0
-                                ) / 60.0
-                            )
+                            (COALESCE(whe.product_downtime_minutes, 0) / 60.0)
                         ELSE 0
                     END AS product_efficiency
 
@@ -148,41 +138,16 @@ class MrpProductionSlip(models.Model):
                 LEFT JOIN mrp_production mo
                     ON mo.id = whe.production_id
 
-                LEFT JOIN mrp_workorder wo
-                    ON wo.production_id = mo.id
+                /* first operation of the MO, one row per entry */
+                LEFT JOIN LATERAL (
+                    SELECT w.name, w.duration_expected
+                    FROM mrp_workorder w
+                    WHERE w.production_id = whe.production_id
+                    ORDER BY w.id
+                    LIMIT 1
+                ) wo ON TRUE
 
                 LEFT JOIN work_center_shift ws
                     ON ws.id = whe.shift_id
-
-                LEFT JOIN work_center_hourly_entry_reason_line rl
-                    ON rl.hourly_entry_id = whe.id
-
-                LEFT JOIN wc_downtime_reason r
-                    ON r.id = rl.reason_id
-
-                GROUP BY
-                    whe.id,
-                    wo.workcenter_id,
-                    whe.time,
-                    whe.create_date,
-                    whe.production_id,
-                    mo.product_id,
-                    whe.shift_id,
-                    mo.origin,
-                    wo.name,
-                    whe.operator_one_id,
-                    whe.operator_two_id,
-                    ws.supervisor_one_id,
-                    ws.supervisor_two_id,
-                    whe.unit_weight,
-                    mo.cavity,
-                    wo.duration_expected,
-                    whe.actual_cycle_time,
-                    whe.qc_check,
-                    whe.produced_qty_number,
-                    whe.produced_weight_kg,
-                    whe.reject_qty_number,
-                    whe.reject_weight_kg,
-                    whe.rejection_reason
             )
         """)
@@ -0,0 +1,122 @@
+from datetime import timedelta
+
+from odoo import api, fields, models
+from odoo.osv import expression
+from odoo.tools import SQL
+
+
+class ReportWindowMixin(models.AbstractModel):
+    """SQL reports computed for the search window only.
+
+    Instead of a view over the whole history, the report query is built per
+    window: the date range, machines and products of the search domain are
+    pushed into the query before any GROUP BY or window function. The domain
+    itself is still applied on top, so the window only needs to be a superset
+    of the result; a search without dates reads the whole history. Report ids
+    must be derived from the underlying keys so that a record keeps its id
+    whatever the window.
+
+    Reports inheriting the mixin implement :meth:`_window_query` and, so that
+    their records can be read back by id, :meth:`_window_for_ids`.
+    """
+    _name = 'report.window.mixin'
+    _description = 'Report Window'
+
+    # report fields the window is read from (None when the report has none)
+    _window_date_field = 'date'
+    _window_machine_field = 'machine_id'
+    _window_product_field = 'product_id'
+
+    @property
+    def _table_query(self):
+        return self._window_query(dict(self.env.context.get('report_window') or {}))
+
+    def _window_query(self, window):
+        """Hook: return the report query, as :class:`SQL`, restricted to ``window``.
+
+        ``window`` may hold ``date_from``/``date_to`` (dates), ``machine_ids``
+        and ``product_ids`` (tuples of ids); use :meth:`_window_where` to turn
+        it into a condition on the source rows.
+        """
+        raise NotImplementedError("%s must implement _window_query()" % self._name)
+
+    @api.model
+    def _window_for_ids(self, ids):
+        """Hook: return a window containing the report rows ``ids``.
+
+        Used when records are read by id outside of a search (form views,
+        buttons). The default bounds nothing, i.e. reads the whole history.
+        """
+        return {}
+
+    @api.model
+    def _window_where(self, window, date=None, datetime=None, machine=None, product=None):
+        """Return the condition restricting the source rows to ``window``.
+
+        ``date``/``datetime`` and ``machine``/``product`` are the SQL
+        expressions of the source columns; datetime columns are compared on
+        a half-open range so that their indexes stay usable.
+        """
+        conditions = []
+        date_from, date_to = window.get('date_from'), window.get('date_to')
+        if date and date_from:
+            conditions.append(SQL("%s >= %s", SQL(date), date_from))
+        if date and date_to:
+            conditions.append(SQL("%s <= %s", SQL(date), date_to))
+        if datetime and date_from:
+            conditions.append(SQL("%s >= %s", SQL(datetime), date_from))
+        if datetime and date_to:
+            conditions.append(SQL("%s < %s", SQL(datetime), date_to + timedelta(days=1)))
+        if machine and window.get('machine_ids'):
+            conditions.append(SQL("%s IN %s", SQL(machine), tuple(window['machine_ids'])))
+        if product and window.get('product_ids'):
+            conditions.append(SQL("%s IN %s", SQL(product), tuple(window['product_ids'])))
+        return SQL(" AND ").join(conditions) if conditions else SQL("TRUE")
+
+    @api.model
+    def _extract_window(self, domain):
+        """Read the date range, machines and products AND-ed in ``domain``."""
+        window = {}
+        domain = expression.normalize_domain(list(domain or []))
+        if any(term in ('|', '!') for term in domain):
+            return window
+        id_keys = {
+            self._window_machine_field: 'machine_ids',
+            self._window_product_field: 'product_ids',
+        }
+        id_keys.pop(None, None)
+        for leaf in domain:
+            if not isinstance(leaf, (list, tuple)) or len(leaf) != 3:
+                continue
+            field, operator, value = leaf
+            if field == self._window_date_field and value:
+                try:
+                    value = fields.Date.to_date(value)
+                except (TypeError, ValueError):
+                    continue
+                if operator in ('>=', '>', '='):
+                    window['date_from'] = max(window.get('date_from', value), value)
+                if operator in ('<=', '<', '='):
+                    window['date_to'] = min(window.get('date_to', value), value)
+            elif field in id_keys and operator in ('=', 'in'):
+                ids = [value] if isinstance(value, int) else value
+                if not isinstance(ids, (list, tuple)) or not all(
+                    isinstance(i, int) and not isinstance(i, bool) for i in ids
+                ):
+                    continue
+                key = id_keys[field]
+                ids = set(ids) & set(window[key]) if key in window else set(ids)
+                # an empty window would match everything, keep a dummy id instead
+                window[key] = tuple(sorted(ids)) or (0,)
+        return window
+
+    @api.model
+    def _search(self, domain, offset=0, limit=None, order=None, **kwargs):
+        self = self.with_context(report_window=self._extract_window(domain))
+        return super(ReportWindowMixin, self)._search(domain, offset, limit, order, **kwargs)
+
+    def fetch(self, field_names=None):
+        # records read by id (not through a search) get a window covering them
+        if 'report_window' not in self.env.context and self.ids:
+            self = self.with_context(report_window=self._window_for_ids(tuple(self.ids)))
+        return super(ReportWindowMixin, self).fetch(field_names)
@@ -20,19 +20,21 @@ class RMLossReport(models.Model):
         tools.drop_view_if_exists(self.env.cr, self._table)
         self.env.cr.execute("""
             CREATE OR REPLACE VIEW rm_loss_report AS (
+                -- one row per raw material of the MO, see mrp.production.rm.line
                 SELECT
-                    row_number() OVER () AS id,
+                    rl.id AS id,
                     mo.date_finished::date AS date,
                     mo.product_id AS product_id,
-                    mo.rm_type AS rm_type,
+                    rl.rm_type AS rm_type,
                     mo.colour AS colour,
                     mo.pmemo_number AS pmemo_number,
                     mo.lot_id AS lot_id,
-                    mo.rm_loss_qty AS loss_kg,
-                    mo.rm_loss_percent AS loss_percent
-                FROM mrp_production mo
+                    rl.loss_qty AS loss_kg,
+                    rl.loss_percent AS loss_percent
+                FROM mrp_production_rm_line rl
+                JOIN mrp_production mo ON mo.id = rl.production_id
                 WHERE
                     mo.state = 'done'
-                    AND mo.rm_loss_qty > 0
+                    AND rl.loss_qty > 0
             )
         """)
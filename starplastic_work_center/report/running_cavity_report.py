@@ -90,27 +90,26 @@ class RunningCavityReport(models.Model):
 
 
     def init(self):
-        tools.drop_view_if_exists(self.env.cr, 'running_cavity_report')
+        # a filter on the deviation ledger, see work.center.deviation
+        tools.drop_view_if_exists(self.env.cr, self._table)
         self.env.cr.execute("""
-            CREATE OR REPLACE VIEW running_cavity_report AS (
+            CREATE VIEW running_cavity_report AS (
                 SELECT
-                    row_number() OVER () AS id,
-                    wcs.date,
+                    d.id,
+                    d.date,
                     mo.lot_id,
-                    wo.workcenter_id AS machine_id,
-                    wcs.id AS shift_id,
-                    wcs.mold_id AS product_id,
+                    d.machine_id,
+                    d.shift_id,
+                    d.product_id,
                     wcs.supervisor_one_id,
                     wcs.supervisor_two_id,
-                    wcs.cavity AS running_cavity,
-                    rwc.cavity AS mould_cavity
-                FROM work_center_shift wcs
-                JOIN mrp_production mo ON mo.id = wcs.production_id
-                JOIN mrp_workorder wo ON wo.production_id = mo.id
-                JOIN mrp_routing_workcenter rwc ON rwc.id = wo.operation_id
-                WHERE
-                    COALESCE(wcs.cavity_acknowledged, false) = false
-                    AND COALESCE(wcs.cavity, 0) != COALESCE(rwc.cavity, 0)
+                    d.actual_value::integer AS running_cavity,
+                    d.expected_value::integer AS mould_cavity
+                FROM work_center_deviation d
+                JOIN work_center_shift wcs ON wcs.id = d.shift_id
+                JOIN mrp_production mo ON mo.id = d.production_id
+                WHERE d.type = 'cavity'
+                    AND d.acknowledged = false
             )
         """)
 
@@ -30,45 +30,30 @@ class StdCycleTimeSummary(models.Model):
             )
 
     def init(self):
-        tools.drop_view_if_exists(self.env.cr, 'std_cycle_time_summary')
+        # a filter on the deviation ledger, see work.center.deviation
+        tools.drop_view_if_exists(self.env.cr, self._table)
         self.env.cr.execute("""
-            CREATE OR REPLACE VIEW std_cycle_time_summary AS (
+            CREATE VIEW std_cycle_time_summary AS (
                 SELECT
-                    row_number() OVER () AS id,
-
-                    wcs.id AS shift_id,
-                    wcs.date AS date,
+                    d.id,
+                    d.shift_id,
+                    d.date,
                     mo.lot_id,
-                    wo.workcenter_id AS machine_id,
-                    wcs.mold_id AS product_id,
-
+                    d.machine_id,
+                    d.product_id,
                     wcs.supervisor_one_id,
                     wcs.supervisor_two_id,
-
-                    rwc.cycle_time AS set_cycle_time,
-                    wcs.cycle_time_sec AS std_cycle_time,
-                    pt.unit_weight_tolerance AS tolerance,
-
-                    wcs.cycle_time_reason_id AS reason_id,
-                    wcs.cycle_time_action AS action,
-                    wcs.cycle_time_acknowledged_by AS action_by
-
-                FROM work_center_shift wcs
-                JOIN mrp_production mo
-                    ON mo.id = wcs.production_id
-                JOIN mrp_workorder wo
-                    ON wo.production_id = mo.id
-                JOIN mrp_routing_workcenter rwc
-                    ON rwc.id = wo.operation_id
-                JOIN product_product pp
-                    ON pp.id = wcs.mold_id
-                JOIN product_template pt
-                    ON pt.id = pp.product_tmpl_id
-
-                WHERE
-                    COALESCE(wcs.cycle_time_acknowledged, false) = true
-                    AND COALESCE(wcs.cycle_time_sec, 0) 
-                        != COALESCE(rwc.cycle_time, 0)
+                    d.expected_value AS set_cycle_time,
+                    d.actual_value AS std_cycle_time,
+                    d.tolerance,
+                    d.reason_id,
+                    d.action,
+                    d.acknowledged_by AS action_by
+                FROM work_center_deviation d
+                JOIN work_center_shift wcs ON wcs.id = d.shift_id
+                JOIN mrp_production mo ON mo.id = d.production_id
+                WHERE d.type = 'cycle_time'
+                    AND d.acknowledged = true
             )
         """)
 
@@ -55,6 +55,7 @@ class UnitWeightToleranceReport(models.Model):
     time_slot = fields.Char(string='Time Slot')
     actual_weight = fields.Float(string='Actual Weight')
     std_weight = fields.Float(string='Std Weight')
+    difference = fields.Float(string='Difference')
     tolerance = fields.Float(string='Tolerance (+/-)')
 
 
@@ -79,58 +80,31 @@ class UnitWeightToleranceReport(models.Model):
         }
 
     def init(self):
-        tools.drop_view_if_exists(self.env.cr, 'unit_weight_tolerance_report')
+        # a filter on the deviation ledger, see work.center.deviation
+        tools.drop_view_if_exists(self.env.cr, self._table)
         self.env.cr.execute("""
-            CREATE OR REPLACE VIEW unit_weight_tolerance_report AS (
+            CREATE VIEW unit_weight_tolerance_report AS (
                 SELECT
-                    row_number() OVER () AS id,
-
-                    DATE(whe.create_date) AS date,
+                    d.id,
+                    d.date,
                     mo.lot_id,
-                    wo.workcenter_id AS machine_id,
-                    whe.shift_id AS shift_id,
-                    mo.product_id AS product_id,
-
-                    ws.supervisor_one_id,
-                    ws.supervisor_two_id,
-
-                    whe.time AS time_slot,
-                    whe.unit_weight AS actual_weight,
-
-                    pt.weight AS std_weight,
-
-                    (whe.unit_weight - pt.weight) AS tolerance
-
-                FROM work_center_hourly_entry whe
-
-                JOIN mrp_production mo
-                    ON mo.id = whe.production_id
-
-                JOIN mrp_workorder wo
-                    ON wo.production_id = mo.id
-
-                JOIN work_center_shift ws
-                    ON ws.id = whe.shift_id
-
-                JOIN product_product pp
-                    ON pp.id = mo.product_id
-
-                JOIN product_template pt
-                    ON pt.id = pp.product_tmpl_id
-
-                LEFT JOIN stock_move_line sml
-                    ON sml.production_id = mo.id
-                    AND sml.product_id = mo.product_id
-
-                WHERE
-                    COALESCE(ws.unit_weight_acknowledged, false) = false
-
-                    -- IMPORTANT CONDITION
-                    AND whe.unit_weight IS NOT NULL
-                    AND pt.weight IS NOT NULL
-                    AND whe.unit_weight <> pt.weight
-                )
-            """)
+                    d.machine_id,
+                    d.shift_id,
+                    d.product_id,
+                    wcs.supervisor_one_id,
+                    wcs.supervisor_two_id,
+                    d.time_slot,
+                    d.actual_value AS actual_weight,
+                    d.expected_value AS std_weight,
+                    d.difference,
+                    d.tolerance
+                FROM work_center_deviation d
+                JOIN work_center_shift wcs ON wcs.id = d.shift_id
+                JOIN mrp_production mo ON mo.id = d.production_id
+                WHERE d.type = 'unit_weight'
+                    AND d.acknowledged = false
+            )
+        """)
 
 
 class UnitWeightToleranceActionLog(models.Model):
@@ -22,6 +22,7 @@ class UnitWeightToleranceSummary(models.Model):
 
     actual_weight = fields.Float(string='Actual Weight')
     std_weight = fields.Float(string='Std Weight')
+    difference = fields.Float(string='Difference')
     tolerance = fields.Float(string='Tolerance (+/-)')
 
     action = fields.Char(string='Action')
@@ -36,57 +37,31 @@ class UnitWeightToleranceSummary(models.Model):
                 rec.shift_desplay = False
 
     def init(self):
-        tools.drop_view_if_exists(self.env.cr, 'unit_weight_tolerance_summary')
+        # a filter on the deviation ledger, see work.center.deviation
+        tools.drop_view_if_exists(self.env.cr, self._table)
         self.env.cr.execute("""
-            CREATE OR REPLACE VIEW unit_weight_tolerance_summary AS (
+            CREATE VIEW unit_weight_tolerance_summary AS (
                 SELECT
-                    row_number() OVER () AS id,
-
-                    DATE(whe.create_date) AS date,
-                    mo.lot_id AS lot_id,
-
-                    wo.workcenter_id AS machine_id,
-                    whe.shift_id AS shift_id,
-                    mo.product_id AS product_id,
-
-                    ws.supervisor_one_id,
-                    ws.supervisor_two_id,
-
-                    whe.time AS time,
-                    whe.unit_weight AS actual_weight,
-
-                    pt.weight AS std_weight,
-                    (whe.unit_weight - pt.weight) AS tolerance,
-
-                    ws.unit_weight_reason_id AS reason_id,
-                    ws.unit_weight_action AS action,
-                    ws.unit_weight_acknowledged_by AS action_by
-
-                FROM work_center_hourly_entry whe
-
-                JOIN mrp_production mo
-                    ON mo.id = whe.production_id
-
-                JOIN mrp_workorder wo
-                    ON wo.production_id = mo.id
-
-                JOIN work_center_shift ws
-                    ON ws.id = whe.shift_id
-
-                JOIN product_product pp
-                    ON pp.id = mo.product_id
-
-                JOIN product_template pt
-                    ON pt.id = pp.product_tmpl_id
-
-                LEFT JOIN stock_move_line sml
-                    ON sml.production_id = mo.id
-                    AND sml.product_id = mo.product_id
-
-                WHERE
-                    COALESCE(ws.unit_weight_acknowledged, false) = true
-                    AND whe.unit_weight IS NOT NULL
-                    AND pt.weight IS NOT NULL
-                    AND ABS(whe.unit_weight - pt.weight) > 0.0001
+                    d.id,
+                    d.date,
+                    mo.lot_id,
+                    d.machine_id,
+                    d.shift_id,
+                    d.product_id,
+                    wcs.supervisor_one_id,
+                    wcs.supervisor_two_id,
+                    d.time_slot AS time,
+                    d.actual_value AS actual_weight,
+                    d.expected_value AS std_weight,
+                    d.difference,
+                    d.tolerance,
+                    d.reason_id,
+                    d.action,
+                    d.acknowledged_by AS action_by
+                FROM work_center_deviation d
+                JOIN work_center_shift wcs ON wcs.id = d.shift_id
+                JOIN mrp_production mo ON mo.id = d.production_id
+                WHERE d.type = 'unit_weight'
+                    AND d.acknowledged = true
             )
         """)
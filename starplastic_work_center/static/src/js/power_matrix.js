@@ -1,32 +1,168 @@
 /** @odoo-module **/
 
 import { registry } from "@web/core/registry";
-import { Component, onWillStart, useState } from "@odoo/owl";
+import { rpc } from "@web/core/network/rpc";
+import { Component, onMounted, onWillStart, onWillUnmount, useRef, useState } from "@odoo/owl";
+
+const ROW_HEIGHT = 32;
+const OVERSCAN = 15;
+
+// Survives the component: reopening the action renders from here at once,
+// then revalidates against the server version stamp.
+const matrixCache = {
+    version: null,
+    meta: null,
+    blocks: new Map(),
+};
 
 class PowerMatrix extends Component {
 
     setup() {
 
+        this.scrollRef = useRef("scroller");
+        this.pending = new Set();
+
         this.state = useState({
-            data: [],
-            machines: []
+            machines: [],
+            months: [],
+            totals: null,
+            totalRows: 0,
+            start: 0,
+            end: 0,
+            revision: 0,
         });
 
         onWillStart(async () => {
+            if (matrixCache.meta) {
+                this.applyMeta(matrixCache.meta);
+                this.revalidate();
+            } else {
+                await this.loadMeta();
+            }
+        });
 
-            const response = await fetch("/power/matrix/data", {
-                method: "POST",
-                headers: {
-                    "Content-Type": "application/json",
-                },
-                body: JSON.stringify({}),
-            });
+        onMounted(() => {
+            this.onScroll();
+        });
+
+        onWillUnmount(() => {
+            this.pending.clear();
+        });
+    }
+
+    // ------------------------------------------------------------------
+    // Data
+    // ------------------------------------------------------------------
+
+    async loadMeta() {
+        const meta = await rpc("/power/matrix/meta", {});
+        matrixCache.blocks.clear();
+        matrixCache.meta = meta;
+        matrixCache.version = meta.version;
+        this.applyMeta(meta);
+    }
 
-            const result = await response.json();
+    async revalidate() {
+        const { version } = await rpc("/power/matrix/version", {});
+        if (version !== matrixCache.version) {
+            await this.loadMeta();
+            this.onScroll();
+        }
+    }
 
-            this.state.data = result.result.rows || [];
-            this.state.machines = result.result.workcenters || [];
+    applyMeta(meta) {
+        let offset = 0;
+        this.state.machines = meta.workcenters || [];
+        this.state.totals = meta.totals;
+        this.state.months = (meta.months || []).map((m) => {
+            const month = { ...m, offset };
+            offset += m.count;
+            return month;
         });
+        this.state.totalRows = offset;
+    }
+
+    async loadBlock(month) {
+        if (matrixCache.blocks.has(month.month) || this.pending.has(month.month)) {
+            return;
+        }
+        this.pending.add(month.month);
+        const version = matrixCache.version;
+        const [year, mon] = month.month.split("-").map(Number);
+        const lastDay = new Date(year, mon, 0).getDate();
+        try {
+            const result = await rpc("/power/matrix/data", {
+                date_from: `${month.month}-01`,
+                date_to: `${month.month}-${String(lastDay).padStart(2, "0")}`,
+                page_size: month.count,
+            });
+            if (version === matrixCache.version) {
+                matrixCache.blocks.set(month.month, result.rows || []);
+                this.state.revision++;
+            }
+        } finally {
+            this.pending.delete(month.month);
+        }
+    }
+
+    // ------------------------------------------------------------------
+    // Virtual scrolling
+    // ------------------------------------------------------------------
+
+    onScroll() {
+        const el = this.scrollRef.el;
+        const height = el ? el.clientHeight : ROW_HEIGHT * 30;
+        const scrollTop = el ? el.scrollTop : 0;
+        const first = Math.floor(scrollTop / ROW_HEIGHT);
+        this.state.start = Math.max(first - OVERSCAN, 0);
+        this.state.end = Math.min(
+            first + Math.ceil(height / ROW_HEIGHT) + OVERSCAN,
+            this.state.totalRows
+        );
+        for (const month of this.state.months) {
+            if (month.offset < this.state.end && month.offset + month.count > this.state.start) {
+                this.loadBlock(month);
+            }
+        }
+    }
+
+    get visibleRows() {
+        // depend on revision so freshly loaded blocks re-render
+        this.state.revision;
+        const rows = [];
+        for (const month of this.state.months) {
+            const from = Math.max(this.state.start, month.offset);
+            const to = Math.min(this.state.end, month.offset + month.count);
+            if (from >= to) {
+                continue;
+            }
+            const block = matrixCache.blocks.get(month.month);
+            for (let index = from; index < to; index++) {
+                const row = block && block[index - month.offset];
+                rows.push({ key: `${month.month}_${index - month.offset}`, row });
+            }
+        }
+        return rows;
+    }
+
+    get topPadding() {
+        return this.state.start * ROW_HEIGHT;
+    }
+
+    get bottomPadding() {
+        return Math.max(this.state.totalRows - this.state.end, 0) * ROW_HEIGHT;
+    }
+
+    get rowHeight() {
+        return ROW_HEIGHT;
+    }
+
+    get columnCount() {
+        return this.state.machines.length + 9;
+    }
+
+    format(value) {
+        return (value || 0).toFixed(2);
     }
 }
 
@@ -35,4 +171,4 @@ PowerMatrix.template = "starplastic_work_center.power_matrix_template";
 registry.category("actions").add(
     "power_consumption_matrix_view",
     PowerMatrix
-);
\ No newline at end of file
+);
@@ -0,0 +1 @@
+from . import test_rm_return
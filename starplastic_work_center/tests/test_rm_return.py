@@ -0,0 +1,44 @@
+from odoo.tests import Form, TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestRmReturn(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.granule = cls.env['product.product'].create({
+            'name': 'Granule',
+            'is_storable': True,
+        })
+        cls.finished = cls.env['product.product'].create({
+            'name': 'Moulded Cap',
+            'is_storable': True,
+        })
+        bom = cls.env['mrp.bom'].create({
+            'product_tmpl_id': cls.finished.product_tmpl_id.id,
+            'product_qty': 1.0,
+            'bom_line_ids': [(0, 0, {'product_id': cls.granule.id, 'product_qty': 2.0})],
+        })
+        mo_form = Form(cls.env['mrp.production'])
+        mo_form.product_id = cls.finished
+        mo_form.bom_id = bom
+        mo_form.product_qty = 10.0
+        cls.production = mo_form.save()
+        cls.production.action_confirm()
+
+    def test_return_same_product_twice_in_one_create(self):
+        """Two lines of one MO and product get one done move each."""
+        lines = self.env['mrp.rm.return.line'].create([{
+            'production_id': self.production.id,
+            'product_id': self.granule.id,
+            'source_location_id': self.production.production_location_id.id,
+            'location_id': self.production.location_src_id.id,
+            'quantity': quantity,
+        } for quantity in (3.0, 4.0)])
+
+        self.assertEqual(lines.mapped('state'), ['done', 'done'])
+        self.assertEqual(len(lines.stock_move_id), 2)
+        for line in lines:
+            self.assertEqual(line.stock_move_id.state, 'done')
+            self.assertEqual(line.stock_move_id.product_uom_qty, line.quantity)